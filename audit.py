@@ -0,0 +1,255 @@
+"""
+Bulk strength audit of existing password files.
+
+Streams a file with one password per line through password.py's strength
+model and writes one probability per input line (line N of the output
+scores line N of the input), followed by a summary histogram:
+
+    python audit.py credentials.txt -o scores.txt
+    python audit.py credentials.txt --workers 4 --json
+
+With --blocklist, every password is also looked up in a compromised-password
+blocklist (see blocklist.py); the output then has a second, tab-separated
+column that is 1 for listed passwords, and the summary counts them.
+
+The file is read in blocks of whole lines, so memory use depends on the
+block size, not on the file size. Each block is featurised and scored in a
+single batch, either in this process or on a pool of worker processes that
+memory-map the NumPy inference model. Only the trailing line break is
+stripped from each line; every other byte, including spaces, is part of the
+password. Lines that are not valid UTF-8 are decoded with surrogate escapes
+and scored like other non-ASCII passwords.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from blocklist import Blocklist
+from password import PasswordGenerator
+
+AUDIT_BLOCK_BYTES = 1 << 22  # Bytes of input read and scored per block
+AUDIT_BINS = 10
+
+_worker_generator = None  # The model of a worker process, see init_worker()
+_worker_blocklist = None
+
+
+def iter_blocks(f, block_bytes=AUDIT_BLOCK_BYTES):
+    """
+    Reads a binary file in blocks of about `block_bytes` that end on a line
+    break (except possibly the last one).
+
+    Yields:
+        bytes: The blocks; together they are exactly the file contents.
+    """
+    if block_bytes < 1:
+        raise ValueError("Block size must be at least 1 byte.")
+    carry = b''
+    while True:
+        data = f.read(block_bytes)
+        if not data:
+            if carry:
+                yield carry
+            return
+        data = carry + data
+        end = data.rfind(b'\n') + 1
+        if end:
+            carry = data[end:]
+            yield data[:end]
+        else:
+            carry = data
+
+
+def split_block(block):
+    """The passwords in a block, with their line breaks removed."""
+    lines = block.split(b'\n')
+    if lines[-1] == b'':
+        lines.pop()
+    return [line.rstrip(b'\r').decode('utf-8', 'surrogateescape') for line in lines]
+
+
+def load_generator(model_paths=None):
+    """A PasswordGenerator with its model loaded (or trained on first use)."""
+    generator = PasswordGenerator(autoload=False)
+    if model_paths is not None:
+        generator.model_path, generator.scaler_path, generator.inference_path = model_paths
+    generator.load_model()
+    return generator
+
+
+def init_worker(model_paths, blocklist_path=None):
+    global _worker_generator, _worker_blocklist
+    with contextlib.redirect_stdout(sys.stderr):
+        _worker_generator = load_generator(model_paths)
+    if blocklist_path is not None:
+        _worker_blocklist = Blocklist(blocklist_path)
+
+
+def score_block(block, generator=None, blocklist=None):
+    """
+    Scores every password in a block.
+
+    Returns:
+        tuple: (float array of probabilities, list of blocklist flags or None)
+    """
+    generator = generator or _worker_generator
+    blocklist = blocklist or _worker_blocklist
+    passwords = split_block(block)
+    listed = None if blocklist is None else [password in blocklist for password in passwords]
+    return generator.score_passwords(passwords), listed
+
+
+def format_scores(scores, listed=None):
+    if listed is None:
+        return ''.join(f'{score:.4f}\n' for score in scores.tolist())
+    return ''.join(f'{score:.4f}\t{int(hit)}\n' for score, hit in zip(scores.tolist(), listed))
+
+
+def audit_stream(f, out=None, generator=None, workers=1, block_bytes=AUDIT_BLOCK_BYTES,
+                 bins=AUDIT_BINS, threshold=None, blocklist_path=None):
+    """
+    Scores every line of the binary file object `f`.
+
+    Args:
+        out (file, optional): Text file receiving one probability per line.
+        generator (PasswordGenerator, optional): Model to score with; loaded
+            with the default model files when omitted.
+        workers (int): Worker processes; 1 scores in this process.
+        block_bytes (int): Approximate bytes of input per scored batch.
+        bins (int): Number of equal-width histogram bins over [0, 1].
+        threshold (float, optional): Scores below this count as weak
+            (default: the generator's strength_threshold).
+        blocklist_path (str, optional): Blocklist file to look every
+            password up in.
+
+    Returns:
+        dict: Count, mean score, weak count and fraction, histogram
+              (bin edges and counts), blocklisted count (None without a
+              blocklist), elapsed seconds and passwords/second.
+    """
+    import numpy as np
+    if bins < 1:
+        raise ValueError("Number of bins must be at least 1.")
+    if generator is None:
+        generator = load_generator()
+    if threshold is None:
+        threshold = generator.strength_threshold
+
+    counts = np.zeros(bins, dtype=np.int64)
+    total = weak = 0
+    listed_total = None if blocklist_path is None else 0
+    score_sum = 0.0
+    start = time.perf_counter()
+
+    def consume(result):
+        nonlocal total, weak, score_sum, listed_total
+        scores, listed = result
+        counts[:] += np.histogram(scores, bins=bins, range=(0.0, 1.0))[0]
+        total += len(scores)
+        weak += int(np.count_nonzero(scores < threshold))
+        score_sum += float(scores.sum(dtype=np.float64))
+        if listed is not None:
+            listed_total += sum(listed)
+        if out is not None:
+            out.write(format_scores(scores, listed))
+
+    blocks = iter_blocks(f, block_bytes)
+    if workers > 1:
+        model_paths = (generator.model_path, generator.scaler_path, generator.inference_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(model_paths, blocklist_path)) as pool:
+            # Keep a bounded number of blocks in flight so memory stays constant
+            pending = deque()
+            for block in blocks:
+                pending.append(pool.submit(score_block, block))
+                if len(pending) >= 2 * workers:
+                    consume(pending.popleft().result())
+            while pending:
+                consume(pending.popleft().result())
+    elif blocklist_path is not None:
+        with Blocklist(blocklist_path) as blocklist:
+            for block in blocks:
+                consume(score_block(block, generator, blocklist))
+    else:
+        for block in blocks:
+            consume(score_block(block, generator))
+
+    elapsed = time.perf_counter() - start
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    return {
+        'passwords': total,
+        'mean_score': score_sum / total if total else 0.0,
+        'threshold': threshold,
+        'weak': weak,
+        'weak_fraction': weak / total if total else 0.0,
+        'histogram': {'edges': [round(float(e), 6) for e in edges], 'counts': counts.tolist()},
+        'blocklisted': listed_total,
+        'elapsed_s': elapsed,
+        'passwords_per_second': total / elapsed if elapsed else 0.0,
+    }
+
+
+def audit_file(path, out_path=None, **kwargs):
+    """Runs audit_stream() over the file at `path`, writing scores to `out_path` ('-' for stdout)."""
+    with open(path, 'rb') as f:
+        if out_path is None:
+            return audit_stream(f, **kwargs)
+        if out_path == '-':
+            return audit_stream(f, sys.stdout, **kwargs)
+        with open(out_path, 'w') as out:
+            return audit_stream(f, out, **kwargs)
+
+
+def print_summary(summary, file=sys.stdout):
+    total = summary['passwords']
+    print(f"{total} passwords scored in {summary['elapsed_s']:.2f}s "
+          f"({summary['passwords_per_second']:,.0f} passwords/s)", file=file)
+    print(f"Mean strength: {summary['mean_score']:.3f}; below {summary['threshold']:.2f}: "
+          f"{summary['weak']} ({summary['weak_fraction']:.1%})", file=file)
+    if summary['blocklisted'] is not None:
+        print(f"On the blocklist: {summary['blocklisted']}", file=file)
+    edges, counts = summary['histogram']['edges'], summary['histogram']['counts']
+    peak = max(counts) or 1
+    for low, high, count in zip(edges, edges[1:], counts):
+        bar = '#' * round(40 * count / peak)
+        print(f"  [{low:.2f}, {high:.2f}{']' if high == 1.0 else ')'} {count:>10}  {bar}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a file of passwords (one per line) with the strength model.")
+    parser.add_argument('file', help="password file, one password per line")
+    parser.add_argument('-o', '--output', help="write one probability per line here ('-' for stdout)")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument('--block-size', type=int, default=AUDIT_BLOCK_BYTES,
+                        help=f"bytes of input scored per batch (default: {AUDIT_BLOCK_BYTES})")
+    parser.add_argument('--bins', type=int, default=AUDIT_BINS, help="histogram bins (default: 10)")
+    parser.add_argument('--threshold', type=float, help="scores below this count as weak (default: 0.6)")
+    parser.add_argument('--blocklist', metavar='PATH', help="also look passwords up in this blocklist file")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    # Scores may go to stdout, so the summary and model messages go to stderr then
+    report = sys.stderr if args.output == '-' else sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        generator = load_generator()
+    try:
+        summary = audit_file(args.file, args.output, generator=generator, workers=args.workers,
+                             block_bytes=args.block_size, bins=args.bins, threshold=args.threshold,
+                             blocklist_path=args.blocklist)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(summary, indent=2), file=report)
+    else:
+        print_summary(summary, report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
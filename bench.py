@@ -0,0 +1,347 @@
+"""
+Benchmarks for the password generators and the tic-tac-toe AI.
+
+Runs headless (no Tk window is created), seeds every random source it can,
+and writes the timings as JSON so later runs can be compared against a
+stored baseline:
+
+    python bench.py run -o baseline.json
+    python bench.py run -o current.json
+    python bench.py compare baseline.json current.json --tolerance 0.15
+
+`compare` exits with status 1 when any benchmark got slower than the
+baseline by more than the tolerance. Use `run --quick` for a fast smoke run
+that skips the slowest cases (full-board minimax, model training).
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import password
+import selfplay
+import tictac
+from strength_model import NumpyStrengthModel
+
+pass_module = importlib.import_module('pass')  # "pass" is a keyword, so no plain import
+
+BENCHMARKS = []  # (name, setup(seed) -> (callable, ops per call), repeat, slow)
+
+
+def benchmark(name, repeat=5, slow=False):
+    def register(setup):
+        BENCHMARKS.append((name, setup, repeat, slow))
+        return setup
+    return register
+
+
+def sample_passwords(seed, count, min_length=8, max_length=24):
+    rng = random.Random(seed)
+    alphabet = ''.join(chr(c) for c in range(33, 127))
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length)))
+            for _ in range(count)]
+
+
+def trained_generator(seed, samples=5000):
+    """A password.PasswordGenerator trained in a temporary directory."""
+    generator = password.PasswordGenerator(autoload=False)
+    with tempfile.TemporaryDirectory(prefix='bench-model-') as directory:
+        generator.model_path = os.path.join(directory, 'model.joblib')
+        generator.scaler_path = os.path.join(directory, 'scaler.joblib')
+        generator.inference_path = os.path.join(directory, 'model.npz')
+        # No feature store or model versions: nothing outside the temporary
+        # directory, and no registry writes inside the train_model timing
+        generator.feature_store_path = None
+        generator.registry_path = None
+        generator.training_samples = samples
+        generator.training_seed = seed
+        generator.train_model()
+    return generator
+
+
+# pass.py
+
+for low, high in ((8, 16), (16, 32), (64, 128)):
+    def setup(seed, low=low, high=high):
+        random.seed(seed)
+        generator = pass_module.PasswordGenerator()
+        generator.min_length, generator.max_length = low, high
+        return lambda: [generator.generate_password() for _ in range(1000)], 1000
+    benchmark(f'pass.generate_password[{low}-{high}]')(setup)
+
+
+@benchmark('pass.generate_many[16]')
+def setup(seed):
+    random.seed(seed)
+    generator = pass_module.PasswordGenerator()
+    generator.min_length = generator.max_length = 16
+    return lambda: generator.generate_many(100000), 100000
+
+
+# password.py
+
+@benchmark('password.extract_features')
+def setup(seed):
+    passwords = sample_passwords(seed, 5000)
+    extract = password.PasswordGenerator.extract_features
+    return lambda: [extract(p) for p in passwords], len(passwords)
+
+
+@benchmark('password.extract_features_batch')
+def setup(seed):
+    passwords = sample_passwords(seed, 50000)
+    return lambda: password.PasswordGenerator.extract_features_batch(passwords), len(passwords)
+
+
+@benchmark('password.create_training_data[30000]', repeat=3)
+def setup(seed):
+    generator = password.PasswordGenerator(autoload=False)
+    return lambda: generator.create_training_data(30000, seed=seed, workers=1), 30000
+
+
+@benchmark('password.train_model[5000]', repeat=1, slow=True)
+def setup(seed):
+    return lambda: trained_generator(seed), 1
+
+
+def predict_setup(seed, rows, engine):
+    generator = trained_generator(seed)
+    features = generator.extract_features_batch(sample_passwords(seed, rows))
+    if engine == 'numpy':
+        numpy_model = NumpyStrengthModel.from_sklearn(generator.model, generator.scaler)
+        return lambda: [numpy_model.score(features) for _ in range(200)], 200 * rows
+    return lambda: [generator.score_features(features) for _ in range(200)], 200 * rows
+
+
+for rows in (1, 256):
+    for engine in ('sklearn', 'numpy'):
+        benchmark(f'password.predict_proba[{engine},{rows}]', repeat=3, slow=True)(
+            lambda seed, rows=rows, engine=engine: predict_setup(seed, rows, engine))
+
+
+# Short lengths mostly cannot reach the threshold; their mutation search must give up early
+for low, high in ((8, 10), (16, 24)):
+    def setup(seed, low=low, high=high):
+        generator = trained_generator(seed)
+        generator.min_length, generator.max_length = low, high
+        return lambda: [generator.generate_password() for _ in range(200)], 200
+    benchmark(f'password.generate_password[{low}-{high}]', repeat=3, slow=True)(setup)
+
+
+# tictac.py
+
+MID_GAME_BOARDS = {
+    'mid2': [['O', ' ', ' '],
+             [' ', 'X', ' '],
+             [' ', ' ', ' ']],
+    'mid4': [['O', 'X', ' '],
+             [' ', 'X', ' '],
+             [' ', 'O', ' ']],
+}
+
+
+def copy_board(board):
+    return [row[:] for row in board]
+
+
+def cold(func):
+    """Runs func with an empty transposition table, so every call searches."""
+    def run():
+        tictac.transposition_table.clear()
+        return func()
+    return run
+
+
+for name, board in MID_GAME_BOARDS.items():
+    benchmark(f'tictac.find_best_move[{name}]')(
+        lambda seed, board=board: (cold(lambda: tictac.find_best_move(copy_board(board), use_book=False)), 1))
+    benchmark(f'tictac.minimax[{name}]')(
+        lambda seed, board=board: (cold(lambda: tictac.minimax(copy_board(board), 0, True)), 1))
+
+
+@benchmark('tictac.find_best_move[empty]', repeat=3, slow=True)
+def setup(seed):
+    return cold(lambda: tictac.find_best_move([[' '] * 3 for _ in range(3)], use_book=False)), 1
+
+
+@benchmark('tictac.minimax[empty]', repeat=3, slow=True)
+def setup(seed):
+    return cold(lambda: tictac.minimax([[' '] * 3 for _ in range(3)], 0, True)), 1
+
+
+@benchmark('tictac.node_checks[list]')
+def setup(seed):
+    board = copy_board(MID_GAME_BOARDS['mid4'])
+
+    def run():
+        for _ in range(10000):
+            tictac.check_win(board, 'X')
+            tictac.check_win(board, 'O')
+            tictac.is_board_full(board)
+            tictac.get_empty_cells(board)
+    return run, 10000
+
+
+@benchmark('tictac.node_checks[bitboard]')
+def setup(seed):
+    x, o = tictac.board_to_bits(MID_GAME_BOARDS['mid4'])
+
+    def run():
+        for _ in range(10000):
+            tictac.IS_WIN[x]
+            tictac.IS_WIN[o]
+            tictac.bits_full(x, o)
+            list(tictac.iter_empty_bits(x, o))
+    return run, 10000
+
+
+@benchmark('tictac.find_best_move[empty,warm]')
+def setup(seed):
+    tictac.transposition_table.clear()
+    tictac.find_best_move([[' '] * 3 for _ in range(3)], use_book=False)
+    return lambda: [tictac.find_best_move([[' '] * 3 for _ in range(3)], use_book=False) for _ in range(100)], 100
+
+
+@benchmark('tictac.find_best_move[empty,book]')
+def setup(seed):
+    if tictac.get_opening_book() is None:
+        raise RuntimeError("Opening book missing; run python tictac.py --build-book")
+    return lambda: [tictac.find_best_move([[' '] * 3 for _ in range(3)]) for _ in range(100)], 100
+
+
+for size, win_length in ((3, 3), (4, 4), (5, 4)):
+    def setup(seed, size=size, win_length=win_length):
+        # Fixed depth instead of a time budget, so the work is the same on every run
+        engine = tictac.SearchEngine(size, win_length, time_budget=None)
+        depth = min(size * size, 5)
+
+        def run():
+            engine.table.clear()
+            engine.negamax(0, 0, depth, -engine.WIN_SCORE - 1, engine.WIN_SCORE + 1, 0)
+        return run, 1
+    benchmark(f'tictac.SearchEngine[{size}x{size},k={win_length},depth5]')(setup)
+
+
+@benchmark('selfplay.play_chunk[perfect-vs-epsilon,10000]')
+def setup(seed):
+    return lambda: selfplay.play_chunk(('perfect', 'epsilon:0.2', 'alternate', seed, 0, 10000)), 10000
+
+
+def run_benchmarks(seed=0, quick=False, select=None, log=print):
+    """
+    Runs the registered benchmarks and returns the JSON-serialisable report.
+
+    Each benchmark is set up once, then timed `repeat` times; the report
+    keeps the median and the best time per operation.
+    """
+    results = {}
+    for name, setup, repeat, slow in BENCHMARKS:
+        if (quick and slow) or (select and not any(s in name for s in select)):
+            continue
+        random.seed(seed)
+        func, ops = setup(seed)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) / ops)
+        results[name] = {
+            'seconds_per_op': statistics.median(timings),
+            'best_seconds_per_op': min(timings),
+            'ops': ops,
+            'repeat': repeat,
+        }
+        log(f"{name:45s} {format_time(results[name]['seconds_per_op'])}/op")
+    return {
+        'meta': {
+            'seed': seed,
+            'quick': quick,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current, tolerance=0.10):
+    """
+    Compares two reports benchmark by benchmark.
+
+    The best time of each run is compared, as it is the least sensitive to
+    noise from other processes on the machine.
+
+    Returns:
+        list[tuple]: (name, baseline s/op, current s/op, ratio, regressed)
+        for every benchmark present in both reports.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        if name not in current['results']:
+            continue
+        before = base['best_seconds_per_op']
+        after = current['results'][name]['best_seconds_per_op']
+        ratio = after / before if before else float('inf')
+        rows.append((name, before, after, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the password generators and tic-tac-toe AI.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the benchmarks")
+    run.add_argument('-o', '--output', help="write the JSON report here (default: stdout)")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--quick', action='store_true', help="skip the slow benchmarks")
+    run.add_argument('-k', '--select', action='append',
+                     help="only run benchmarks whose name contains this (repeatable)")
+
+    compare = commands.add_parser('compare', help="compare a report against a baseline")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--tolerance', type=float, default=0.10,
+                         help="allowed slowdown as a fraction (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        # Progress and the generators' own messages go to stderr, keeping
+        # stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            report = run_benchmarks(args.seed, args.quick, args.select)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressed = False
+    for name, before, after, ratio, slower in compare_reports(baseline, current, args.tolerance):
+        flag = 'REGRESSION' if slower else ''
+        print(f"{name:45s} {format_time(before)} -> {format_time(after)}  x{ratio:5.2f} {flag}")
+        regressed = regressed or slower
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Compromised-password blocklist backed by an on-disk Bloom filter.
+
+A plain-text list of leaked or banned passwords (one per line) is compiled
+once into a compact binary file:
+
+    python blocklist.py build breached.txt blocklist.bin --fp-rate 0.001 --exact
+    python blocklist.py check blocklist.bin 'hunter2' 'correct horse'
+
+The file is memory-mapped when opened, so a lookup touches only the few
+pages holding its bits and the list itself is never loaded into memory.
+Lookups hash the password once with BLAKE2b and derive the k filter
+positions from two 64-bit halves of the digest (double hashing).
+
+A Bloom filter never misses a listed password but reports unlisted ones
+with probability fp_rate. With --exact the file also carries a sorted
+table of the 64-bit digest prefixes of all listed passwords; hits of the
+filter are then confirmed by binary search, which brings false positives
+down to about n / 2**64.
+
+Layout (little endian): a fixed header, the filter bits, then the sorted
+uint64 index (empty without --exact).
+"""
+import argparse
+import array
+import hashlib
+import math
+import mmap
+import struct
+import sys
+from bisect import bisect_left
+
+BLOCKLIST_MAGIC = b'PWBLOOM\0'
+BLOCKLIST_VERSION = 1
+# magic, version, hash count k, filter bits m, listed passwords n, index entries
+BLOCKLIST_HEADER = struct.Struct('<8sHHQQQ')
+DEFAULT_FP_RATE = 0.001
+SCREEN_MAX_ROUNDS = 100  # Replacement rounds before screen_passwords gives up
+
+# What the generators do with a listed password
+BLOCKLIST_REJECT = 'reject'  # Replace it with a fresh password
+BLOCKLIST_FLAG = 'flag'      # Keep it, but count it in the stats
+
+
+def password_bytes(password):
+    if isinstance(password, str):
+        return password.encode('utf-8', 'surrogateescape')
+    return password
+
+
+def digest_pair(data):
+    """The two 64-bit hashes of a password's bytes."""
+    return struct.unpack('<QQ', hashlib.blake2b(data, digest_size=16).digest())
+
+
+def filter_parameters(n, fp_rate):
+    """Bits m and hash count k of the smallest filter for n items at fp_rate."""
+    if not 0 < fp_rate < 1:
+        raise ValueError("False-positive rate must be between 0 and 1.")
+    n = max(n, 1)
+    m = max(8, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+    m = (m + 7) // 8 * 8
+    k = max(1, round(m / n * math.log(2)))
+    return m, k
+
+
+def iter_source(path):
+    """The non-empty lines of a password list, as bytes without line breaks."""
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.rstrip(b'\r\n')
+            if line:
+                yield line
+
+
+def build_blocklist(source, path, fp_rate=DEFAULT_FP_RATE, exact=False):
+    """
+    Compiles the password list at `source` into a blocklist file at `path`.
+
+    The source is read twice (once to count it, once to hash it), so it
+    must be a regular file.
+
+    Returns:
+        dict: The parameters of the written file (see Blocklist.info()).
+    """
+    n = sum(1 for _ in iter_source(source))
+    m, k = filter_parameters(n, fp_rate)
+    bits = bytearray(m // 8)
+    index = array.array('Q')
+    for line in iter_source(source):
+        h1, h2 = digest_pair(line)
+        for i in range(k):
+            position = (h1 + i * h2) % m
+            bits[position >> 3] |= 1 << (position & 7)
+        if exact:
+            index.append(h1)
+    index_bytes = b''
+    if exact:
+        # Sort the packed hashes in place and drop duplicates, without ever
+        # holding them as Python ints
+        import numpy as np
+        hashes = np.frombuffer(index, dtype=np.uint64)
+        hashes.sort()
+        keep = np.empty(len(hashes), dtype=bool)
+        keep[:1] = True
+        np.not_equal(hashes[1:], hashes[:-1], out=keep[1:])
+        index_bytes = hashes[keep].astype('<u8', copy=False).tobytes()
+
+    with open(path, 'wb') as f:
+        f.write(BLOCKLIST_HEADER.pack(BLOCKLIST_MAGIC, BLOCKLIST_VERSION, k, m, n, len(index_bytes) // 8))
+        f.write(bits)
+        f.write(index_bytes)
+    with Blocklist(path) as blocklist:
+        return blocklist.info()
+
+
+class Blocklist:
+    """
+    A memory-mapped blocklist file; see build_blocklist().
+
+    Raises:
+        OSError: If the file cannot be opened.
+        ValueError: If it is not a blocklist file of a supported version.
+    """
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.data) < BLOCKLIST_HEADER.size:
+                raise ValueError(f"{path} is not a blocklist file.")
+            magic, version, self.k, self.m, self.n, index_count = BLOCKLIST_HEADER.unpack_from(self.data)
+            if magic != BLOCKLIST_MAGIC or version != BLOCKLIST_VERSION:
+                raise ValueError(f"{path} is not a version {BLOCKLIST_VERSION} blocklist file.")
+            index_offset = BLOCKLIST_HEADER.size + self.m // 8
+            if self.m % 8 or self.k < 1 or len(self.data) != index_offset + 8 * index_count:
+                raise ValueError(f"{path} is truncated or damaged.")
+        except ValueError:
+            self.data.close()
+            raise
+        self.path = path
+        self.bits = memoryview(self.data)[BLOCKLIST_HEADER.size:index_offset]
+        self._index_bytes = memoryview(self.data)[index_offset:]
+        self.index = None
+        if index_count and sys.byteorder == 'little':
+            self.index = self._index_bytes.cast('Q')
+        elif index_count:
+            # Big-endian hosts get a native copy of the (little-endian) index
+            self.index = array.array('Q', self._index_bytes.tobytes())
+            self.index.byteswap()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        # The views must go before the map they point into can be closed
+        if isinstance(self.index, memoryview):
+            self.index.release()
+        self._index_bytes.release()
+        self.bits.release()
+        self.data.close()
+
+    @property
+    def exact(self):
+        return self.index is not None
+
+    def might_contain(self, password):
+        """Bloom filter test: False means certainly not listed."""
+        return self._filter_hit(*digest_pair(password_bytes(password)))
+
+    def _filter_hit(self, h1, h2):
+        bits, m = self.bits, self.m
+        for i in range(self.k):
+            position = (h1 + i * h2) % m
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def __contains__(self, password):
+        h1, h2 = digest_pair(password_bytes(password))
+        if not self._filter_hit(h1, h2):
+            return False
+        if self.index is None:
+            return True
+        i = bisect_left(self.index, h1)
+        return i < len(self.index) and self.index[i] == h1
+
+    def info(self):
+        """Header values plus the expected false-positive rate of the filter alone."""
+        fp_rate = (1 - math.exp(-self.k * self.n / self.m)) ** self.k if self.n else 0.0
+        return {'path': self.path, 'passwords': self.n, 'bits': self.m, 'hashes': self.k,
+                'exact': self.exact, 'filter_fp_rate': fp_rate,
+                'size_bytes': len(self.data)}
+
+
+def screen_passwords(blocklist, passwords, replace=None, max_rounds=SCREEN_MAX_ROUNDS):
+    """
+    Checks a list of passwords against a blocklist, in place.
+
+    Args:
+        blocklist (Blocklist): The list to check against.
+        passwords (list[str]): Passwords to check.
+        replace (callable, optional): Called with a count, returns that many
+            fresh passwords. When given, listed passwords are replaced
+            (and the replacements checked again) until none is listed.
+        max_rounds (int): Replacement rounds allowed.
+
+    Returns:
+        int: How many listed passwords were found, replacements included.
+
+    Raises:
+        ValueError: If listed passwords remain after max_rounds rounds,
+            e.g. because the policy can only produce listed passwords.
+    """
+    hits = [i for i, password in enumerate(passwords) if password in blocklist]
+    found = len(hits)
+    rounds = 0
+    while hits and replace is not None:
+        if rounds == max_rounds:
+            raise ValueError(f"{len(hits)} password(s) still on the blocklist after {max_rounds} "
+                             f"replacement rounds; the settings may only allow listed passwords.")
+        rounds += 1
+        for i, password in zip(hits, replace(len(hits))):
+            passwords[i] = password
+        hits = [i for i in hits if passwords[i] in blocklist]
+        found += len(hits)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a compromised-password blocklist.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="compile a password list (one per line) into a blocklist file")
+    build.add_argument('source')
+    build.add_argument('output')
+    build.add_argument('--fp-rate', type=float, default=DEFAULT_FP_RATE,
+                       help=f"Bloom filter false-positive rate (default: {DEFAULT_FP_RATE})")
+    build.add_argument('--exact', action='store_true',
+                       help="also store a sorted hash index to confirm filter hits")
+
+    check = commands.add_parser('check', help="look passwords up (from the arguments, or stdin)")
+    check.add_argument('blocklist')
+    check.add_argument('passwords', nargs='*')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            info = build_blocklist(args.source, args.output, args.fp_rate, args.exact)
+            print(f"[INFO] {info['passwords']} passwords -> {info['size_bytes']} bytes "
+                  f"({info['hashes']} hashes, filter false-positive rate {info['filter_fp_rate']:.2g}"
+                  f"{', exact index' if info['exact'] else ''}).")
+            return 0
+
+        listed = 0
+        with Blocklist(args.blocklist) as blocklist:
+            passwords = args.passwords or (line.rstrip('\r\n') for line in sys.stdin)
+            for password in passwords:
+                hit = password in blocklist
+                listed += hit
+                print(f"{'LISTED' if hit else 'ok'}\t{password}")
+        return 1 if listed else 0
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Append-only store of labelled feature rows for the strength model.
+
+Rows are the six extract_features columns (float32) with an int8 label. They
+live in flat binary files in one directory, next to a JSON manifest:
+
+    features.f32   rows x N_FEATURES float32, C order
+    labels.i8      one int8 label per row
+    manifest.json  schema version, committed row count and one entry per
+                   appended batch (first row, row count, source, time)
+
+Appending writes the data files first and then replaces the manifest, so the
+committed row count only ever moves forward. Bytes past it (left by an
+append that was interrupted) are ignored and cut off by the next append.
+Reads memory-map the files, so a training job can slice out just the rows it
+needs without loading the whole store.
+"""
+import json
+import os
+import time
+
+FEATURE_SCHEMA_VERSION = 1
+FEATURE_NAMES = ('upper', 'lower', 'digits', 'special', 'length', 'entropy')
+N_FEATURES = len(FEATURE_NAMES)
+
+FEATURES_FILE = 'features.f32'
+LABELS_FILE = 'labels.i8'
+MANIFEST_FILE = 'manifest.json'
+
+
+class FeatureStore:
+    """
+    A feature store directory, created on first use.
+
+    Raises:
+        ValueError: If the directory holds a store of another schema version.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path(MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {'schema_version': FEATURE_SCHEMA_VERSION, 'feature_names': list(FEATURE_NAMES),
+                    'rows': 0, 'batches': []}
+        if manifest.get('schema_version') != FEATURE_SCHEMA_VERSION:
+            raise ValueError(f"Feature store {self.directory} has schema version "
+                             f"{manifest.get('schema_version')} (expected {FEATURE_SCHEMA_VERSION}).")
+        return manifest
+
+    def _write_manifest(self, manifest):
+        tmp = self._path(MANIFEST_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path(MANIFEST_FILE))
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    @property
+    def batches(self):
+        return list(self.manifest['batches'])
+
+    def append(self, X, y, source=''):
+        """
+        Appends labelled rows as one batch.
+
+        Args:
+            X: Array-like of shape (n, N_FEATURES).
+            y: Array-like of n labels (0 weak, 1 strong).
+            source (str): Free-form note on where the rows came from.
+
+        Returns:
+            tuple: (first row, row count) of the new batch.
+        """
+        import numpy as np
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.int8)
+        if X.ndim != 2 or X.shape[1] != N_FEATURES:
+            raise ValueError(f"Features must have shape (n, {N_FEATURES}).")
+        if y.shape != (len(X),):
+            raise ValueError("Labels must have one entry per feature row.")
+
+        start = self.rows
+        for name, data, row_bytes in ((FEATURES_FILE, X, 4 * N_FEATURES), (LABELS_FILE, y, 1)):
+            with open(self._path(name), 'ab') as f:
+                f.truncate(start * row_bytes)  # Drop bytes of an interrupted append
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        manifest = dict(self.manifest)
+        manifest['rows'] = start + len(X)
+        manifest['batches'] = self.manifest['batches'] + [
+            {'start': start, 'rows': len(X), 'source': source, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}]
+        self._write_manifest(manifest)
+        self.manifest = manifest
+        return start, len(X)
+
+    def arrays(self, start=0, stop=None, mmap=True):
+        """
+        Rows [start, stop) of the store.
+
+        Returns:
+            tuple: (float32 features of shape (n, N_FEATURES), int8 labels),
+                   memory-mapped read-only views unless mmap=False.
+        """
+        import numpy as np
+        stop = self.rows if stop is None else min(stop, self.rows)
+        start = min(max(start, 0), stop)
+        if stop == start:
+            return np.zeros((0, N_FEATURES), dtype=np.float32), np.zeros(0, dtype=np.int8)
+        if mmap:
+            X = np.memmap(self._path(FEATURES_FILE), dtype=np.float32, mode='r',
+                          offset=4 * N_FEATURES * start, shape=(stop - start, N_FEATURES))
+            y = np.memmap(self._path(LABELS_FILE), dtype=np.int8, mode='r',
+                          offset=start, shape=(stop - start,))
+            return X.view(np.ndarray), y.view(np.ndarray)
+        with open(self._path(FEATURES_FILE), 'rb') as f:
+            f.seek(4 * N_FEATURES * start)
+            X = np.fromfile(f, dtype=np.float32, count=(stop - start) * N_FEATURES).reshape(-1, N_FEATURES)
+        with open(self._path(LABELS_FILE), 'rb') as f:
+            f.seek(start)
+            y = np.fromfile(f, dtype=np.int8, count=stop - start)
+        return X, y
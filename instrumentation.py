@@ -0,0 +1,140 @@
+"""
+Opt-in instrumentation for the password generators.
+
+An Instrumentation object records per-stage timings and event counters.
+It is disabled by default; while disabled, timer() hands back a shared
+no-op context manager and count() returns after one attribute check, so
+instrumented code paths cost next to nothing.
+
+    stats = Instrumentation(enabled=True)
+    with stats.timer('predict_proba'):
+        ...
+    stats.count('predicted_weak', 3)
+    stats.snapshot()   # {'timings': {...}, 'counters': {...}}
+"""
+import json
+import threading
+import time
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ('stats', 'stage', 'start')
+
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Per-stage timings and counters with a stats() style snapshot.
+
+    Args:
+        enabled (bool): Start recording immediately.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timings = {}   # stage -> [calls, total seconds, max seconds]
+        self._counters = {}
+        self._dump_thread = None
+        self._dump_stop = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+    def timer(self, stage):
+        """Context manager timing one run of `stage`."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def add_time(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._timings.get(stage)
+            if entry is None:
+                self._timings[stage] = [1, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                if seconds > entry[2]:
+                    entry[2] = seconds
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'enabled': bool,
+                   'timings': {stage: {'calls', 'total_s', 'mean_s', 'max_s'}},
+                   'counters': {name: value}}
+        """
+        with self._lock:
+            timings = {stage: {'calls': calls, 'total_s': total, 'mean_s': total / calls, 'max_s': peak}
+                       for stage, (calls, total, peak) in self._timings.items()}
+            counters = dict(self._counters)
+        return {'enabled': self.enabled, 'timings': timings, 'counters': counters}
+
+    def dump(self, path=None, log=print):
+        """Writes the snapshot as JSON to `path`, or logs it as one line."""
+        text = json.dumps(self.snapshot(), sort_keys=True)
+        if path:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+        else:
+            log(f"[STATS] {text}")
+
+    def start_periodic_dump(self, interval, path=None, log=print):
+        """
+        Dumps the snapshot every `interval` seconds from a daemon thread
+        until stop_periodic_dump() is called.
+        """
+        self.stop_periodic_dump()
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                self.dump(path, log)
+
+        self._dump_stop = stop
+        self._dump_thread = threading.Thread(target=run, name="stats-dump", daemon=True)
+        self._dump_thread.start()
+
+    def stop_periodic_dump(self):
+        if self._dump_stop is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_stop = self._dump_thread = None
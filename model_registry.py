@@ -0,0 +1,106 @@
+"""
+Versioned strength-model artifacts.
+
+Every trained model gets its own numbered directory holding the sklearn
+model and scaler (joblib), the NumPy inference export (.npz) and a JSON
+record of how it was trained:
+
+    password_models/
+        CURRENT            version number of the active model
+        v0001/             model.joblib  scaler.joblib  model.npz  meta.json
+        v0002/ ...
+
+Versions are never modified after they are written. Switching the active
+model (after a retrain, or to roll one back) only rewrites CURRENT, so a
+rollback costs a file copy rather than a retrain.
+"""
+import json
+import os
+import shutil
+import time
+
+from strength_model import NumpyStrengthModel
+
+CURRENT_FILE = 'CURRENT'
+META_FILE = 'meta.json'
+ARTIFACTS = {'model': 'model.joblib', 'scaler': 'scaler.joblib', 'inference': 'model.npz'}
+
+
+class ModelRegistry:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def version_dir(self, version):
+        return os.path.join(self.directory, f'v{version:04d}')
+
+    def versions(self):
+        """All stored version numbers, oldest first."""
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith('v') and name[1:].isdigit() and \
+                    os.path.exists(os.path.join(self.directory, name, META_FILE)):
+                found.append(int(name[1:]))
+        return sorted(found)
+
+    def current(self):
+        """The active version, or None before the first register()."""
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as f:
+                return int(f.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set_current(self, version):
+        if version not in self.versions():
+            raise ValueError(f"Model version {version} does not exist.")
+        tmp = os.path.join(self.directory, CURRENT_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            f.write(f'{version}\n')
+        os.replace(tmp, os.path.join(self.directory, CURRENT_FILE))
+
+    def meta(self, version):
+        with open(os.path.join(self.version_dir(version), META_FILE)) as f:
+            return json.load(f)
+
+    def artifact(self, version, kind):
+        """Path of one artifact ('model', 'scaler' or 'inference') of a version."""
+        return os.path.join(self.version_dir(version), ARTIFACTS[kind])
+
+    def register(self, model, scaler, meta, make_current=True):
+        """
+        Stores a trained model and scaler as a new version.
+
+        Args:
+            meta (dict): How the model was trained; version, parent and
+                creation time are added.
+
+        Returns:
+            int: The new version number.
+        """
+        import joblib
+
+        versions = self.versions()
+        version = versions[-1] + 1 if versions else 1
+        directory = self.version_dir(version)
+        tmp = directory + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        joblib.dump(model, os.path.join(tmp, ARTIFACTS['model']))
+        joblib.dump(scaler, os.path.join(tmp, ARTIFACTS['scaler']))
+        NumpyStrengthModel.from_sklearn(model, scaler).save(os.path.join(tmp, ARTIFACTS['inference']))
+        meta = dict(meta, version=version, parent=self.current(),
+                    created=time.strftime('%Y-%m-%dT%H:%M:%S'))
+        with open(os.path.join(tmp, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, directory)
+        if make_current:
+            self.set_current(version)
+        return version
+
+    def publish(self, version, model_path, scaler_path, inference_path):
+        """Copies a version's artifacts to the paths a PasswordGenerator loads from."""
+        for kind, path in (('model', model_path), ('scaler', scaler_path), ('inference', inference_path)):
+            tmp = path + '.tmp'
+            shutil.copyfile(self.artifact(version, kind), tmp)
+            os.replace(tmp, path)
@@ -10,20 +10,197 @@ Now includes:
 - GUI with Tkinter
 """
 
+import time
+STARTUP_TIME = time.perf_counter()
+
+import math
 import os
 import string
-import random
 import secrets
-import numpy as np
-import joblib
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import tkinter as tk
 from tkinter import messagebox
-from sklearn.neural_network import MLPClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+
+from blocklist import BLOCKLIST_FLAG, BLOCKLIST_REJECT, Blocklist, screen_passwords
+from feature_store import FeatureStore
+from instrumentation import Instrumentation
+from model_registry import ModelRegistry
+from password_policy import PasswordPolicy
+from strength_model import NumpyStrengthModel
+
+# numpy, joblib and scikit-learn are imported where they are used, so that
+# importing this module (and showing the GUI) does not wait for them.
+
+AMBIGUOUS_CHARS = 'l1Io0O'
+STARTUP_BUDGET = 1.0  # Seconds allowed from process start to the first drawn window
+
+# Model states reported by PasswordGenerator.model_status
+MODEL_NOT_LOADED = "not loaded"
+MODEL_LOADING = "loading"
+MODEL_TRAINING = "training"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+# Cascade scoring: generated passwords are decided from their policy entropy
+# alone when it is clearly high or clearly low; only the band in between
+# reaches the model. Even the smallest three-class pool needs 71 bits for the
+# 12 characters the model treats as strong, so both bounds are far from its
+# decision boundary. Passwords of unknown origin always go to the model.
+CASCADE_STRONG_BITS = 100.0
+CASCADE_WEAK_BITS = 40.0
+
+# Character classes used by the byte-level feature extraction
+CLASS_NONE, CLASS_UPPER, CLASS_LOWER, CLASS_DIGIT, CLASS_SPECIAL = range(5)
+FEATURE_BLOCK_ROWS = 4096  # Rows histogrammed at a time in extract_features_batch
+
+def build_byte_classes():
+    classes = bytearray(256)  # CLASS_NONE everywhere else
+    for chars, cls in ((string.ascii_uppercase, CLASS_UPPER), (string.ascii_lowercase, CLASS_LOWER),
+                       (string.digits, CLASS_DIGIT), (string.punctuation, CLASS_SPECIAL)):
+        for c in chars.encode('ascii'):
+            classes[c] = cls
+    return bytes(classes)
+
+BYTE_CLASSES = build_byte_classes()  # Byte value -> character class
+
+_class_table = None
+
+def get_class_table():
+    """Returns BYTE_CLASSES as a NumPy lookup table."""
+    global _class_table
+    import numpy as np
+    if _class_table is None:
+        _class_table = np.frombuffer(BYTE_CLASSES, dtype=np.uint8)
+    return _class_table
+
+_plogp = [0.0]
+
+def plogp(count):
+    """count * log2(count), memoized; the building block of the entropy updates."""
+    while len(_plogp) <= count:
+        n = len(_plogp)
+        _plogp.append(n * math.log2(n))
+    return _plogp[count]
+
+class MutablePassword:
+    """
+    A bytearray-backed ASCII password that keeps its extract_features
+    columns up to date under single-character substitutions.
+
+    Besides the class counts it tracks the byte histogram and the running
+    sum S = sum(c * log2(c)) over it, so the Shannon entropy
+    log2(n) - S / n is available after every substitution in O(1).
+    """
+    def __init__(self, password):
+        self.chars = bytearray(password.encode('ascii'))
+        self.class_counts = [0] * 5
+        self.histogram = [0] * 256
+        for c in self.chars:
+            self.class_counts[BYTE_CLASSES[c]] += 1
+            self.histogram[c] += 1
+        self.plogp_sum = sum(plogp(count) for count in self.histogram if count)
+
+    def __len__(self):
+        return len(self.chars)
+
+    def __str__(self):
+        return self.chars.decode('ascii')
+
+    def entropy(self, plogp_sum=None):
+        n = len(self.chars)
+        if not n:
+            return 0
+        if plogp_sum is None:
+            plogp_sum = self.plogp_sum
+        return max(math.log2(n) - plogp_sum / n, 0.0)
+
+    def features(self):
+        counts = self.class_counts
+        return [counts[CLASS_UPPER], counts[CLASS_LOWER], counts[CLASS_DIGIT],
+                counts[CLASS_SPECIAL], len(self.chars), self.entropy()]
+
+    def plogp_sum_after(self, index, new):
+        old = self.chars[index]
+        if old == new:
+            return self.plogp_sum
+        old_count, new_count = self.histogram[old], self.histogram[new]
+        return (self.plogp_sum
+                - plogp(old_count) + plogp(old_count - 1)
+                - plogp(new_count) + plogp(new_count + 1))
+
+    def features_after(self, index, new):
+        """Features the password would have with byte `new` at `index`."""
+        counts = list(self.class_counts)
+        counts[BYTE_CLASSES[self.chars[index]]] -= 1
+        counts[BYTE_CLASSES[new]] += 1
+        return [counts[CLASS_UPPER], counts[CLASS_LOWER], counts[CLASS_DIGIT],
+                counts[CLASS_SPECIAL], len(self.chars),
+                self.entropy(self.plogp_sum_after(index, new))]
+
+    def keeps_minimums(self, index, new, minimums):
+        """Whether byte `new` at `index` leaves every class at its minimum count."""
+        old_class = BYTE_CLASSES[self.chars[index]]
+        return old_class == BYTE_CLASSES[new] or self.class_counts[old_class] > minimums[old_class]
+
+    def substitute(self, index, new):
+        old = self.chars[index]
+        if old == new:
+            return
+        self.plogp_sum = self.plogp_sum_after(index, new)
+        self.class_counts[BYTE_CLASSES[old]] -= 1
+        self.class_counts[BYTE_CLASSES[new]] += 1
+        self.histogram[old] -= 1
+        self.histogram[new] += 1
+        self.chars[index] = new
+
+TRAINING_MIN_LENGTH = 8
+TRAINING_MAX_LENGTH = 20
+TRAINING_CHUNK_SIZE = 50000  # Samples per training-data chunk (and per RNG stream)
+TRAINING_POOLS = (string.ascii_uppercase, string.ascii_lowercase, string.digits, string.punctuation)
+
+def make_training_chunk(task):
+    """
+    Generates one chunk of synthetic training data.
+
+    Each sample picks a length in [TRAINING_MIN_LENGTH, TRAINING_MAX_LENGTH]
+    and a random subset of the four character classes, draws a password from
+    the union of those classes and is labelled strong if it is at least 12
+    characters long and uses 3 or more classes.
+
+    Args:
+        task (tuple): (np.random.SeedSequence, number of samples)
+
+    Returns:
+        tuple: (float32 features of shape (size, 6), int8 labels)
+    """
+    import numpy as np
+    seed, size = task
+    rng = np.random.default_rng(seed)
+
+    lengths = rng.integers(TRAINING_MIN_LENGTH, TRAINING_MAX_LENGTH + 1, size)
+    flags = rng.integers(0, 2, (size, len(TRAINING_POOLS))).astype(bool)
+
+    # One padded alphabet per class combination; no class at all means letters
+    combos = flags.dot(1 << np.arange(len(TRAINING_POOLS)))
+    alphabets = np.zeros((1 << len(TRAINING_POOLS), 94), dtype=np.uint8)
+    alphabet_sizes = np.zeros(1 << len(TRAINING_POOLS), dtype=np.int64)
+    for combo in range(1 << len(TRAINING_POOLS)):
+        pool = ''.join(p for i, p in enumerate(TRAINING_POOLS) if combo >> i & 1) or string.ascii_letters
+        alphabets[combo, :len(pool)] = np.frombuffer(pool.encode('ascii'), dtype=np.uint8)
+        alphabet_sizes[combo] = len(pool)
+
+    char_combos = np.repeat(combos, lengths)
+    indices = rng.integers(0, alphabet_sizes[char_combos])
+    matrix = np.zeros((size, TRAINING_MAX_LENGTH), dtype=np.uint8)
+    matrix[np.arange(TRAINING_MAX_LENGTH) < lengths[:, None]] = alphabets[char_combos, indices]
+
+    X = PasswordGenerator.features_from_matrix(matrix, lengths)
+    y = ((lengths >= 12) & (flags.sum(axis=1) >= 3)).astype(np.int8)  # Strong if complex
+    return X, y
 
 class PasswordGenerator:
-    def __init__(self):
+    def __init__(self, background_load=False, autoload=True, instrument=False):
         self.min_length = 10
         self.max_length = 128
         self.include_uppercase = True
@@ -31,55 +208,385 @@ class PasswordGenerator:
         self.include_numbers = True
         self.include_special_chars = True
         self.avoid_ambiguous_chars = True
+        self.min_per_class = 1  # Characters guaranteed from every selected type
+        self.ml_check = True    # Score (and strengthen) passwords with the model when it is ready
+        self.policy_cache = {}  # settings -> PasswordPolicy
+        self.instrumentation = Instrumentation(enabled=instrument)
 
         self.model = None
         self.scaler = None
         self.model_path = "password_strength_model.joblib"
         self.scaler_path = "password_scaler.joblib"
+        self.inference_path = "password_strength_model.npz"
+        self.use_numpy_inference = True  # Prefer the .npz model over unpickling sklearn
+        self.training_samples = 30000
+        self.training_seed = None  # Seed for reproducible training data (None: fresh entropy)
+        # Training rows and model versions are kept here (None: not recorded);
+        # update_model() continues the active version on new rows only
+        self.feature_store_path = "password_features"
+        self.registry_path = "password_models"
 
-        self.load_model()
+        # Batched scoring: candidates generated and scored per predict_proba call
+        self.strength_threshold = 0.6
+        self.candidate_batch = 16
+        # Guided mutation of weak candidates: each step scores mutation_proposals
+        # single-character substitutions per password and keeps the best one
+        self.max_mutations = 8
+        self.mutation_proposals = 8
+        self.return_best = False  # Return the strongest candidate instead of the first strong one
+        self.reachable_lengths = {}  # (policy, length, threshold) -> see length_can_reach_threshold
+        # Cascade: score 1.0 at or above cascade_strong_bits of entropy, 0.0
+        # below cascade_weak_bits, and ask the model only in between
+        self.cascade = True
+        self.cascade_strong_bits = CASCADE_STRONG_BITS
+        self.cascade_weak_bits = CASCADE_WEAK_BITS
+        self.cascade_counts = {'calls': 0, 'ml_calls': 0, 'rows': 0, 'strong': 0, 'weak': 0, 'ml_rows': 0}
+
+        # Compromised-password blocklist (see blocklist.py): listed passwords
+        # are replaced ('reject') or returned and counted ('flag')
+        self.blocklist = None
+        self.blocklist_action = BLOCKLIST_REJECT
+        self.blocklist_hits = 0
+
+        self.model_status = MODEL_NOT_LOADED
+        self.model_error = None
+        self.loader_thread = None
+
+        if background_load:
+            self.start_background_load()
+        elif autoload:
+            self.load_model()
+
+    def enable_stats(self, enabled=True):
+        """Turns the per-stage timings and counters reported by stats() on or off."""
+        if enabled:
+            self.instrumentation.enable()
+        else:
+            self.instrumentation.disable()
+
+    def stats(self):
+        """Snapshot of the recorded timings and counters (see instrumentation.py)."""
+        snapshot = self.instrumentation.snapshot()
+        snapshot['model_status'] = self.model_status
+        snapshot['cascade'] = self.cascade_report()
+        return snapshot
+
+    def cascade_report(self):
+        """
+        How the cascade scorer decided so far: counts per stage, and the
+        fractions of calls and of passwords that reached the model.
+        """
+        counts = dict(self.cascade_counts)
+        counts['ml_call_fraction'] = counts['ml_calls'] / counts['calls'] if counts['calls'] else 0.0
+        counts['ml_row_fraction'] = counts['ml_rows'] / counts['rows'] if counts['rows'] else 0.0
+        return counts
+
+    def start_stats_dump(self, interval, path=None):
+        """Logs the stats, or writes them as JSON to `path`, every `interval` seconds."""
+        self.instrumentation.start_periodic_dump(interval, path)
+
+    def start_background_load(self):
+        """
+        Loads (or, if needed, trains) the model on a daemon thread. Until it
+        is ready, generate_password works without ML scoring.
+        """
+        if self.loader_thread is not None and self.loader_thread.is_alive():
+            return self.loader_thread
+        self.model_status = MODEL_LOADING
+        self.loader_thread = threading.Thread(target=self.load_model, name="model-loader", daemon=True)
+        self.loader_thread.start()
+        return self.loader_thread
+
+    def model_ready(self):
+        return self.model_status == MODEL_READY
+
+    def wait_until_ready(self, timeout=None):
+        if self.loader_thread is not None:
+            self.loader_thread.join(timeout)
+        return self.model_ready()
+
+    def load_blocklist(self, path, action=BLOCKLIST_REJECT):
+        """Checks generated passwords against the blocklist file at `path`."""
+        if action not in (BLOCKLIST_REJECT, BLOCKLIST_FLAG):
+            raise ValueError(f"Unknown blocklist action {action!r}.")
+        self.blocklist = Blocklist(path)
+        self.blocklist_action = action
+
+    def is_blocklisted(self, password):
+        return self.blocklist is not None and password in self.blocklist
+
+    def screen(self, passwords):
+        """Applies the blocklist to a list of finished passwords, in place."""
+        if self.blocklist is None:
+            return passwords
+        replace = self.replacement_passwords if self.blocklist_action == BLOCKLIST_REJECT else None
+        with self.instrumentation.timer('blocklist'):
+            hits = screen_passwords(self.blocklist, passwords, replace)
+        self.blocklist_hits += hits
+        self.instrumentation.count('blocklist_hits', hits)
+        return passwords
+
+    def replacement_passwords(self, count):
+        """
+        Fresh passwords for blocklisted ones, scored and strengthened like
+        every other generated password when the model is ready.
+        """
+        passwords = self.random_passwords(count)
+        if self.ml_check and self.model_ready():
+            passwords, _ = self.improve_batch(passwords, self.policy_entropy_bits(self.get_policy(), passwords))
+        return passwords
+
+    def get_policy(self):
+        key = (self.min_length, self.max_length, self.include_uppercase, self.include_lowercase,
+               self.include_numbers, self.include_special_chars, self.avoid_ambiguous_chars,
+               self.min_per_class)
+        policy = self.policy_cache.get(key)
+        if policy is not None:
+            self.instrumentation.count('policy_cache_hits')
+            return policy
+        self.instrumentation.count('policy_cache_misses')
+        with self.instrumentation.timer('policy_build'):
+            policy = PasswordPolicy.from_flags(
+                self.min_length, self.max_length,
+                include_uppercase=self.include_uppercase,
+                include_lowercase=self.include_lowercase,
+                include_numbers=self.include_numbers,
+                include_special_chars=self.include_special_chars,
+                avoid_ambiguous_chars=self.avoid_ambiguous_chars,
+                ambiguous=AMBIGUOUS_CHARS,
+                min_per_class=self.min_per_class)
+        self.policy_cache[key] = policy
+        return policy
+
+    def get_char_pool(self):
+        return self.get_policy().pool.chars
+
+    def random_passwords(self, count):
+        """Draws `count` passwords that satisfy the policy, without ML scoring."""
+        return self.get_policy().generate_many(count)
+
+    def score_features(self, features):
+        """Returns the model's probability of being strong for each feature row."""
+        instrumentation = self.instrumentation
+        with instrumentation.timer('scaler.transform'):
+            features_scaled = self.scaler.transform(features)
+        with instrumentation.timer('predict_proba'):
+            scores = self.model.predict_proba(features_scaled)[:, 1]
+        instrumentation.count('rows_scored', len(scores))
+        return scores
+
+    def score_passwords(self, passwords, entropy_bits=None):
+        """
+        Returns the probability of being strong for each password.
+
+        `entropy_bits` is only for passwords drawn from a PasswordPolicy,
+        whose entropy is known (see policy_entropy_bits). With cascade on,
+        those with at least cascade_strong_bits score 1.0 and those below
+        cascade_weak_bits score 0.0 without a model call. Passwords without
+        it (entropy_bits None, or NaN entries) are always scored by the
+        model: the characters of user-chosen passwords are not uniformly
+        random, so their length and classes say little about their strength.
+        """
+        with self.instrumentation.timer('extract_features'):
+            features = self.extract_features_batch(passwords)
+        if not self.cascade:
+            return self.score_features(features)
+        return self.cascade_scores(features, entropy_bits)
+
+    def cascade_scores(self, features, entropy_bits=None):
+        import numpy as np
+        if entropy_bits is None:
+            entropy_bits = np.full(len(features), np.nan)
+        entropy_bits = np.asarray(entropy_bits, dtype=np.float64)
+        scores = np.zeros(len(features), dtype=np.float64)
+        strong = entropy_bits >= self.cascade_strong_bits
+        scores[strong] = 1.0
+        # NaN (unknown entropy) compares False both ways, so it lands here too
+        ambiguous = np.flatnonzero(~strong & ~(entropy_bits < self.cascade_weak_bits))
+        if len(ambiguous):
+            scores[ambiguous] = self.score_features(features[ambiguous])
+
+        counts = self.cascade_counts
+        counts['calls'] += 1
+        counts['ml_calls'] += bool(len(ambiguous))
+        counts['rows'] += len(features)
+        counts['strong'] += int(strong.sum())
+        counts['ml_rows'] += len(ambiguous)
+        counts['weak'] += len(features) - int(strong.sum()) - len(ambiguous)
+        return scores
+
+    def policy_entropy_bits(self, policy, passwords):
+        """Entropy of each password under the policy that generated it."""
+        return [policy.entropy_bits(len(password)) for password in passwords]
+
+    def mutation_alphabet(self):
+        # Add more complexity: inject digits and symbols from the enabled pool
+        char_pool = self.get_char_pool()
+        stronger = ''.join(c for c in char_pool if c in string.digits or c in string.punctuation)
+        return (stronger or char_pool).encode('ascii')
+
+    def strengthen_batch(self, passwords, scores):
+        """
+        Guided search over the passwords scored below strength_threshold.
+
+        Every step proposes mutation_proposals random substitutions for each
+        weak password, computes their features incrementally (MutablePassword),
+        scores all proposals of all passwords in one call and applies the best
+        proposal of each password if it raises the score. Proposals that
+        would take a class below the policy's minimum are never applied, so
+        valid passwords stay valid. A password stops as soon as it reaches
+        the threshold or a step brings no improvement; the search is bounded
+        by max_mutations steps. Passwords of a length that cannot reach the
+        threshold (see length_can_reach_threshold) are not mutated at all.
+
+        Returns:
+            tuple: (passwords, strength probabilities as np.ndarray)
+        """
+        import numpy as np
+        passwords = list(passwords)
+        scores = np.array(scores, dtype=np.float64)
+        alphabet = self.mutation_alphabet()
+        proposals_per = max(1, self.mutation_proposals)
+        minimums = [0] * 5  # Required characters per byte class (see BYTE_CLASSES)
+        policy = self.get_policy()
+        for class_alphabet, minimum in zip(policy.alphabets, policy.min_counts):
+            minimums[BYTE_CLASSES[class_alphabet.bytes[0]]] = minimum
+
+        instrumentation = self.instrumentation
+        start = time.perf_counter()
+        buffers = {i: MutablePassword(passwords[i]) for i in np.flatnonzero(scores < self.strength_threshold)
+                   if passwords[i] and passwords[i].isascii()
+                   and self.length_can_reach_threshold(len(passwords[i]))}
+        weak = list(buffers)
+        for _ in range(self.max_mutations):
+            if not weak:
+                break
+            proposals, rows, forbidden = [], [], []
+            for i in weak:
+                buffer = buffers[i]
+                for _ in range(proposals_per):
+                    index = secrets.randbelow(len(buffer))
+                    new = alphabet[secrets.randbelow(len(alphabet))]
+                    proposals.append((index, new))
+                    rows.append(buffer.features_after(index, new))
+                    if not buffer.keeps_minimums(index, new, minimums):
+                        forbidden.append(len(proposals) - 1)
+            proposal_scores = self.score_features(rows)
+            proposal_scores[forbidden] = -np.inf
+            proposal_scores = proposal_scores.reshape(len(weak), proposals_per)
+            applied, still_weak = 0, []
+            for row, i in enumerate(weak):
+                best = int(np.argmax(proposal_scores[row]))
+                # A password no proposal improves has stalled and is dropped
+                if proposal_scores[row, best] > scores[i]:
+                    buffers[i].substitute(*proposals[row * proposals_per + best])
+                    scores[i] = proposal_scores[row, best]
+                    applied += 1
+                    if scores[i] < self.strength_threshold:
+                        still_weak.append(i)
+            instrumentation.count('mutation_proposals', len(rows))
+            instrumentation.count('mutations', applied)
+            weak = still_weak
+
+        for i, buffer in buffers.items():
+            passwords[i] = str(buffer)
+        instrumentation.add_time('mutation', time.perf_counter() - start)
+        return passwords, scores
+
+    def length_can_reach_threshold(self, length):
+        """
+        Whether mutation can plausibly make a password of `length` strong.
+
+        Mutation only changes characters, never the length, so this asks the
+        model about the best case for that length: the characters spread
+        evenly over the enabled types, all of them distinct. The answer is
+        cached per policy, length and threshold until the model changes.
+        """
+        policy = self.get_policy()
+        key = (policy, length, self.strength_threshold)
+        reachable = self.reachable_lengths.get(key)
+        if reachable is None:
+            columns = [BYTE_CLASSES[alphabet.bytes[0]] - CLASS_UPPER for alphabet in policy.alphabets]
+            row = [0] * 4 + [length, math.log2(min(length, len(policy.pool)))]
+            for n, column in enumerate(columns):
+                row[column] = length // len(columns) + (n < length % len(columns))
+            reachable = self.reachable_lengths[key] = bool(
+                self.score_features([row])[0] >= self.strength_threshold)
+        return reachable
+
+    def improve_batch(self, passwords, entropy_bits=None):
+        """
+        Scores a batch of passwords in one predict_proba call and strengthens
+        the weak ones with strengthen_batch.
+
+        Returns:
+            tuple: (passwords, strength probabilities as np.ndarray)
+        """
+        scores = self.score_passwords(passwords, entropy_bits)
+        self.instrumentation.count('predicted_weak', int((scores < self.strength_threshold).sum()))
+        return self.strengthen_batch(passwords, scores)
 
     def generate_password(self):
-        if not (self.include_uppercase or self.include_lowercase or
-                self.include_numbers or self.include_special_chars):
-            raise ValueError("At least one character type must be selected.")
-
-        length = random.randint(self.min_length, self.max_length)
-
-        char_pool = ''
-        if self.include_uppercase:
-            char_pool += string.ascii_uppercase
-        if self.include_lowercase:
-            char_pool += string.ascii_lowercase
-        if self.include_numbers:
-            char_pool += string.digits
-        if self.include_special_chars:
-            char_pool += string.punctuation
-        if self.avoid_ambiguous_chars:
-            ambiguous = 'l1Io0O'
-            char_pool = ''.join(c for c in char_pool if c not in ambiguous)
-
-        if not char_pool:
-            raise ValueError("Character pool is empty.")
-
-        password = ''.join(secrets.choice(char_pool) for _ in range(length))
-
-        # Enhance with ML Prediction
-        if self.model:
-            features = self.extract_features(password)
-            features_scaled = self.scaler.transform([features])
-            prediction = self.model.predict_proba(features_scaled)[0][1]  # confidence of being strong
-
-            if prediction < 0.6:  # If predicted weak, mutate
-                # Add more complexity
-                for _ in range(3):
-                    index = random.randint(0, len(password) - 1)
-                    replacement = secrets.choice(string.punctuation + string.digits)
-                    password = password[:index] + replacement + password[index+1:]
-
-        return password
-
-    def extract_features(self, password):
+        import numpy as np
+        policy = self.get_policy()
+
+        # The policy already guarantees every selected character type, so the
+        # ML check is an optional extra rather than a repair step
+        instrumentation = self.instrumentation
+        instrumentation.count('passwords_generated')
+        if not (self.ml_check and self.model_ready()):
+            instrumentation.count('unscored_passwords')
+            with instrumentation.timer('candidates'):
+                password = policy.generate()
+            return self.screen([password])[0]
+
+        # Enhance with ML Prediction: score candidate_batch candidates at once
+        with instrumentation.timer('candidates'):
+            candidates = policy.generate_many(max(1, self.candidate_batch))
+        entropy_bits = self.policy_entropy_bits(policy, candidates)
+        if self.cascade and not self.return_best:
+            # A candidate the first cascade stage already accepts ends the search without a model call
+            for candidate, bits in zip(candidates, entropy_bits):
+                if bits >= self.cascade_strong_bits:
+                    counts = self.cascade_counts
+                    counts['calls'] += 1
+                    counts['rows'] += 1
+                    counts['strong'] += 1
+                    return self.screen([candidate])[0]
+        scores = self.score_passwords(candidates, entropy_bits)
+        instrumentation.count('predicted_weak', int((scores < self.strength_threshold).sum()))
+        strong = np.flatnonzero(scores >= self.strength_threshold)
+        if len(strong) and not self.return_best:
+            return self.screen([candidates[strong[0]]])[0]
+
+        best = int(np.argmax(scores))
+        password = candidates[best]
+        if not len(strong):
+            # No candidate predicted strong: guided mutation of the best one only
+            password = self.strengthen_batch([password], scores[best:best + 1])[0][0]
+        return self.screen([password])[0]
+
+    def generate_many(self, count, batch_size=1024):
+        """
+        Generates `count` passwords, scoring them batch_size at a time so the
+        per-call overhead of the scaler and model is shared by the batch.
+        """
+        policy = self.get_policy()
+        passwords = []
+        instrumentation = self.instrumentation
+        while len(passwords) < count:
+            with instrumentation.timer('candidates'):
+                batch = policy.generate_many(min(batch_size, count - len(passwords)))
+            if self.ml_check and self.model_ready():
+                batch, _ = self.improve_batch(batch, self.policy_entropy_bits(policy, batch))
+            else:
+                instrumentation.count('unscored_passwords', len(batch))
+            passwords.extend(self.screen(batch))
+        instrumentation.count('passwords_generated', len(passwords))
+        return passwords
+
+    @staticmethod
+    def extract_features(password):
         upper = sum(1 for c in password if c.isupper())
         lower = sum(1 for c in password if c.islower())
         digits = sum(1 for c in password if c.isdigit())
@@ -90,66 +597,340 @@ class PasswordGenerator:
         entropy = 0
         if length > 0:
             freqs = {c: password.count(c)/length for c in set(password)}
-            entropy = -sum(p * np.log2(p) for p in freqs.values())
+            entropy = -sum(p * math.log2(p) for p in freqs.values())
 
         return [upper, lower, digits, special, length, entropy]
 
-    def create_training_data(self, n=30000):
-        X, y = [], []
-        for _ in range(n):
-            length = random.randint(8, 20)
-            flags = [random.choice([True, False]) for _ in range(4)]
-            char_pool = ''
-            if flags[0]: char_pool += string.ascii_uppercase
-            if flags[1]: char_pool += string.ascii_lowercase
-            if flags[2]: char_pool += string.digits
-            if flags[3]: char_pool += string.punctuation
-            if not char_pool: char_pool = string.ascii_letters
-
-            password = ''.join(secrets.choice(char_pool) for _ in range(length))
-            features = self.extract_features(password)
-            label = 1 if length >= 12 and sum(flags) >= 3 else 0  # Strong if complex
-            X.append(features)
-            y.append(label)
+    @staticmethod
+    def encode_batch(passwords):
+        """
+        Packs ASCII passwords into a zero-padded uint8 matrix.
+
+        Returns:
+            tuple: (matrix of shape (n, max_len), int64 array of lengths)
+        """
+        import numpy as np
+        encoded = [p.encode('ascii') for p in passwords]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        width = int(lengths.max()) if len(encoded) else 0
+        matrix = np.zeros((len(encoded), width), dtype=np.uint8)
+        if width:
+            mask = np.arange(width) < lengths[:, None]
+            matrix[mask] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return matrix, lengths
+
+    @staticmethod
+    def extract_features_batch(passwords):
+        """
+        Vectorized equivalent of extract_features for a list of passwords.
+
+        Class counts come from a byte -> class lookup table and the entropy
+        from per-row byte histograms, so each password is only touched by
+        NumPy. Rows that are not plain ASCII fall back to extract_features.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (n, 6), in the same column
+            order as extract_features.
+        """
+        import numpy as np
+        n = len(passwords)
+        features = np.zeros((n, 6), dtype=np.float32)
+        ascii_rows, ascii_passwords = [], []
+        for i, password in enumerate(passwords):
+            if password.isascii():
+                ascii_rows.append(i)
+                ascii_passwords.append(password)
+            else:
+                features[i] = PasswordGenerator.extract_features(password)
+        if not ascii_passwords:
+            return features
+
+        ascii_rows = np.asarray(ascii_rows, dtype=np.int64)
+        for start in range(0, len(ascii_passwords), FEATURE_BLOCK_ROWS):
+            block = ascii_passwords[start:start + FEATURE_BLOCK_ROWS]
+            matrix, lengths = PasswordGenerator.encode_batch(block)
+            features[ascii_rows[start:start + FEATURE_BLOCK_ROWS]] = \
+                PasswordGenerator.features_from_matrix(matrix, lengths)
+        return features
+
+    @staticmethod
+    def features_from_matrix(matrix, lengths):
+        """
+        Computes the extract_features columns for a zero-padded uint8 matrix
+        of passwords (see encode_batch).
+        """
+        import numpy as np
+        table = get_class_table()
+        features = np.zeros((len(matrix), 6), dtype=np.float32)
+        for start in range(0, len(matrix), FEATURE_BLOCK_ROWS):
+            block = matrix[start:start + FEATURE_BLOCK_ROWS]
+            block_lengths = lengths[start:start + FEATURE_BLOCK_ROWS]
+            m, width = block.shape
+            row_ids = np.repeat(np.arange(m, dtype=np.int64), width)
+
+            # Class counts; padding bytes are 0, which maps to CLASS_NONE
+            classes = table[block].ravel()
+            class_counts = np.bincount(row_ids * 5 + classes, minlength=m * 5).reshape(m, 5)
+
+            # Shannon entropy from the byte histogram of each row
+            hist = np.bincount(row_ids * 256 + block.ravel(), minlength=m * 256).reshape(m, 256)
+            hist[:, 0] -= width - block_lengths
+            safe_lengths = np.maximum(block_lengths, 1)[:, None]
+            probs = hist / safe_lengths
+            logs = np.log2(probs, out=np.zeros_like(probs), where=hist > 0)
+            entropy = -(probs * logs).sum(axis=1)
+
+            rows = slice(start, start + m)
+            features[rows, 0] = class_counts[:, CLASS_UPPER]
+            features[rows, 1] = class_counts[:, CLASS_LOWER]
+            features[rows, 2] = class_counts[:, CLASS_DIGIT]
+            features[rows, 3] = class_counts[:, CLASS_SPECIAL]
+            features[rows, 4] = block_lengths
+            features[rows, 5] = entropy
+        return features
+
+    def create_training_data(self, n=30000, seed=None, workers=None,
+                             chunk_size=TRAINING_CHUNK_SIZE):
+        """
+        Builds n labelled samples in independent chunks of chunk_size.
+
+        Each chunk draws from its own RNG stream spawned from `seed`, so the
+        dataset only depends on (n, seed, chunk_size) and not on how many
+        worker processes produce it. With more than one chunk the chunks are
+        spread over a process pool of `workers` processes (default: one per
+        CPU).
+
+        Returns:
+            tuple: (float32 feature matrix of shape (n, 6), int8 labels)
+        """
+        import numpy as np
+        if n <= 0:
+            return np.zeros((0, 6), dtype=np.float32), np.zeros(0, dtype=np.int8)
+
+        sizes = [min(chunk_size, n - start) for start in range(0, n, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = list(zip(seeds, sizes))
+
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = list(pool.map(make_training_chunk, tasks))
+        else:
+            chunks = [make_training_chunk(task) for task in tasks]
+
+        X = np.concatenate([chunk[0] for chunk in chunks])
+        y = np.concatenate([chunk[1] for chunk in chunks])
         return X, y
 
     def train_model(self):
-        if os.path.exists(self.model_path):
-            print("[INFO] Loading existing model.")
-            self.load_model()
-            return
+        with self.instrumentation.timer('train_model'):
+            if os.path.exists(self.model_path):
+                print("[INFO] Loading existing model.")
+                self.load_model()
+                return
+
+            from sklearn.neural_network import MLPClassifier
+            from sklearn.model_selection import train_test_split
+            from sklearn.preprocessing import StandardScaler
+
+            print("[INFO] Training model...")
+            self.model_status = MODEL_TRAINING
+            X, y = self.create_training_data(self.training_samples, seed=self.training_seed)
+
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
 
-        print("[INFO] Training model...")
-        X, y = self.create_training_data()
+            model = MLPClassifier(hidden_layer_sizes=(64, 32), max_iter=500,
+                                  activation='relu', solver='adam', random_state=42,
+                                  early_stopping=True)
+            model.fit(X_train_scaled, y_train)
+            accuracy = model.score(X_test_scaled, y_test)
+            print(f"[INFO] Model trained. Accuracy: {accuracy:.2f}")
 
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            row_range = self.store_rows(X, y, f"synthetic full training, seed={self.training_seed}")
+            if self.registry_path:
+                version = self.model_registry().register(
+                    model, scaler, {'mode': 'full', 'rows': row_range, 'accuracy': accuracy})
+                print(f"[INFO] Registered model version {version}.")
 
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+            self.set_model(model, scaler)
+            self.save_model()
 
-        self.model = MLPClassifier(hidden_layer_sizes=(64, 32), max_iter=500,
-                                   activation='relu', solver='adam', random_state=42,
-                                   early_stopping=True)
-        self.model.fit(X_train_scaled, y_train)
-        accuracy = self.model.score(X_test_scaled, y_test)
-        print(f"[INFO] Model trained. Accuracy: {accuracy:.2f}")
+    def model_registry(self):
+        """
+        Raises:
+            RuntimeError: If model versions are not recorded (registry_path is None).
+        """
+        if not self.registry_path:
+            raise RuntimeError("Model versions are not recorded (registry_path is None).")
+        return ModelRegistry(self.registry_path)
 
-        self.save_model()
+    def store_rows(self, X, y, source):
+        """Appends training rows to the feature store, if any; returns their [start, stop) range."""
+        if not self.feature_store_path:
+            return None
+        start, rows = FeatureStore(self.feature_store_path).append(X, y, source=source)
+        return [start, start + rows]
+
+    def update_model(self, samples=5000, X=None, y=None, epochs=5, seed=None, activate=True):
+        """
+        Continues the active model version on new rows only.
+
+        The new rows (given, or `samples` fresh synthetic ones) are appended
+        to the feature store. 80% of them train the existing MLP further with
+        partial_fit for `epochs` passes, and the held-out 20% measure its
+        accuracy before and after. The scaler is kept as is, since the
+        network's weights were fitted to its scaling. The result is
+        registered as a new version, which becomes the active model unless
+        activate is False.
+
+        Returns:
+            dict: version, parent, rows used and hold-out accuracy before/after.
+
+        Raises:
+            RuntimeError: If there is no model to continue, or no registry.
+        """
+        import joblib
+        import numpy as np
+        from sklearn.model_selection import train_test_split
+
+        with self.instrumentation.timer('update_model'):
+            registry = self.model_registry()
+            parent = registry.current()
+            if parent is None and os.path.exists(self.model_path):
+                # A model trained before versions were recorded becomes the first one
+                parent = registry.register(joblib.load(self.model_path), joblib.load(self.scaler_path),
+                                           {'mode': 'imported', 'rows': None, 'accuracy': None})
+            if parent is None:
+                raise RuntimeError("No model to continue; train a full model first.")
+            model = joblib.load(registry.artifact(parent, 'model'))
+            scaler = joblib.load(registry.artifact(parent, 'scaler'))
+
+            source = "given rows"
+            if X is None:
+                X, y = self.create_training_data(samples, seed=seed)
+                source = f"synthetic update, seed={seed}"
+            X = np.asarray(X, dtype=np.float32)
+            y = np.asarray(y, dtype=np.int8)
+            row_range = self.store_rows(X, y, source)
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            X_train_scaled = scaler.transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
+            before = model.score(X_test_scaled, y_test)
+
+            # partial_fit does not support early stopping, and needs a best
+            # loss to compare against when the last fit used it
+            model.early_stopping = False
+            if getattr(model, 'best_loss_', None) is None:
+                model.best_loss_ = min(model.loss_curve_)
+            rng = np.random.default_rng(seed)
+            for _ in range(epochs):
+                order = rng.permutation(len(X_train))
+                model.partial_fit(X_train_scaled[order], y_train[order])
+            after = model.score(X_test_scaled, y_test)
+
+            version = registry.register(model, scaler, {
+                'mode': 'incremental', 'rows': row_range, 'epochs': epochs,
+                'holdout_accuracy_before': before, 'accuracy': after}, make_current=False)
+            print(f"[INFO] Model version {version} trained on {len(X)} new rows. "
+                  f"Hold-out accuracy {before:.4f} -> {after:.4f}")
+            if activate:
+                self.activate_model(version)
+            return {'version': version, 'parent': parent, 'rows': row_range,
+                    'accuracy_before': before, 'accuracy_after': after}
+
+    def activate_model(self, version):
+        """Makes a registered version the active model and loads it."""
+        registry = self.model_registry()
+        registry.set_current(version)
+        registry.publish(version, self.model_path, self.scaler_path, self.inference_path)
+        self.load_model()
+
+    def rollback_model(self, version=None):
+        """
+        Switches back to `version`, by default the parent of the active
+        version. No training is involved.
+
+        Returns:
+            int: The version now active.
+        """
+        registry = self.model_registry()
+        if version is None:
+            current = registry.current()
+            version = registry.meta(current)['parent'] if current is not None else None
+            if version is None:
+                raise ValueError("The active model has no earlier version to roll back to.")
+        self.activate_model(version)
+        return version
+
+    def model_versions(self):
+        """The metadata of every registered version, oldest first, with an 'active' flag."""
+        registry = self.model_registry()
+        current = registry.current()
+        return [dict(registry.meta(v), active=v == current) for v in registry.versions()]
+
+    def evaluate_model(self, version, X, y):
+        """Accuracy of a registered version on labelled feature rows (NumPy inference only)."""
+        import numpy as np
+        engine = NumpyStrengthModel.load(self.model_registry().artifact(version, 'inference'))
+        predictions = engine.score(X) >= 0.5
+        return float(np.mean(predictions == np.asarray(y, dtype=bool)))
+
+    def set_model(self, model, scaler):
+        # Publish both objects before flipping the status, so that a caller on
+        # another thread never sees a model without its scaler
+        self.model = model
+        self.scaler = scaler
+        self.reachable_lengths = {}
+        self.model_status = MODEL_READY
 
     def save_model(self):
+        import joblib
         joblib.dump(self.model, self.model_path)
         joblib.dump(self.scaler, self.scaler_path)
+        self.export_inference_model()
         print("[INFO] Model and scaler saved.")
 
+    def export_inference_model(self, path=None):
+        """Writes the scaler and MLP weights to the NumPy inference format."""
+        if isinstance(self.model, NumpyStrengthModel):
+            engine = self.model
+        else:
+            engine = NumpyStrengthModel.from_sklearn(self.model, self.scaler)
+        engine.save(path or self.inference_path)
+        return engine
+
     def load_model(self):
-        try:
-            self.model = joblib.load(self.model_path)
-            self.scaler = joblib.load(self.scaler_path)
-            print("[INFO] Model and scaler loaded.")
-        except Exception:
-            print("[WARNING] Model not found or corrupted. Retraining...")
-            self.train_model()
+        with self.instrumentation.timer('load_model'):
+            if self.model_status != MODEL_TRAINING:
+                self.model_status = MODEL_LOADING
+            if self.use_numpy_inference and os.path.exists(self.inference_path):
+                try:
+                    engine = NumpyStrengthModel.load(self.inference_path)
+                    self.set_model(engine, engine)
+                    print("[INFO] NumPy inference model loaded.")
+                    return
+                except Exception as e:
+                    print(f"[WARNING] Could not load {self.inference_path}: {e}")
+            import joblib
+            try:
+                try:
+                    model = joblib.load(self.model_path)
+                    scaler = joblib.load(self.scaler_path)
+                    self.set_model(model, scaler)
+                    print("[INFO] Model and scaler loaded.")
+                except Exception:
+                    print("[WARNING] Model not found or corrupted. Retraining...")
+                    self.train_model()
+            except Exception as e:
+                self.model_error = e
+                self.model_status = MODEL_FAILED
+                print(f"[ERROR] Model unavailable: {e}")
+                if threading.current_thread() is not self.loader_thread:
+                    raise
 
 class PasswordManagerGUI:
     def __init__(self, root):
@@ -157,7 +938,7 @@ class PasswordManagerGUI:
         self.root.title("AI Password Manager")
         self.root.geometry("420x300")
 
-        self.generator = PasswordGenerator()
+        self.generator = PasswordGenerator(background_load=True)
 
         tk.Label(root, text="Min Length").grid(row=0, column=0)
         self.min_entry = tk.Entry(root)
@@ -188,6 +969,21 @@ class PasswordManagerGUI:
         tk.Button(root, text="Generate", command=self.generate).grid(row=7, column=0, columnspan=2, pady=10)
         tk.Button(root, text="Exit", command=root.quit).grid(row=7, column=2, columnspan=2)
 
+        self.model_var = tk.StringVar()
+        tk.Label(root, textvariable=self.model_var, fg='gray').grid(row=8, column=0, columnspan=4)
+        self.poll_model_status()
+
+    def poll_model_status(self):
+        status = self.generator.model_status
+        if status == MODEL_READY:
+            self.model_var.set("Strength model: ready")
+            return
+        if status == MODEL_FAILED:
+            self.model_var.set("Strength model: unavailable (passwords are not ML-checked)")
+            return
+        self.model_var.set(f"Strength model: {status}... (passwords are not ML-checked yet)")
+        self.root.after(200, self.poll_model_status)
+
     def add_check(self, text, var, row):
         tk.Checkbutton(self.root, text=text, variable=var).grid(row=row, column=0, columnspan=2, sticky=tk.W, padx=10)
 
@@ -207,7 +1003,61 @@ class PasswordManagerGUI:
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
-if __name__ == "__main__":
+def report_startup_time():
+    elapsed = time.perf_counter() - STARTUP_TIME
+    level = "INFO" if elapsed <= STARTUP_BUDGET else "WARNING"
+    print(f"[{level}] Window shown after {elapsed:.3f}s (budget {STARTUP_BUDGET:.1f}s)")
+    return elapsed
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI-powered password generator.")
+    parser.add_argument('--export-model', metavar='PATH', nargs='?', const='',
+                        help="write the NumPy inference model (default: password_strength_model.npz) and exit")
+    parser.add_argument('--update-model', metavar='SAMPLES', type=int, nargs='?', const=5000,
+                        help="continue the active model on SAMPLES new synthetic rows (default: 5000) and exit")
+    parser.add_argument('--list-models', action='store_true', help="list the registered model versions and exit")
+    parser.add_argument('--rollback', metavar='VERSION', type=int, nargs='?', const=-1,
+                        help="reactivate VERSION (default, or negative: the active version's parent) and exit")
+    args = parser.parse_args(argv)
+
+    if args.list_models:
+        generator = PasswordGenerator(autoload=False)
+        for meta in generator.model_versions():
+            marker = '*' if meta['active'] else ' '
+            accuracy = 'n/a' if meta['accuracy'] is None else f"{meta['accuracy']:.4f}"
+            print(f"{marker} v{meta['version']:<4} {meta['mode']:<12} parent={meta['parent']} "
+                  f"rows={meta['rows']} accuracy={accuracy} {meta['created']}")
+        return 0
+
+    if args.update_model is not None or args.rollback is not None:
+        generator = PasswordGenerator(autoload=False)
+        try:
+            if args.update_model is not None:
+                generator.update_model(args.update_model)
+            else:
+                version = generator.rollback_model(None if args.rollback < 0 else args.rollback)
+                print(f"[INFO] Model version {version} is active.")
+        except (RuntimeError, ValueError) as e:
+            print(f"[ERROR] {e}")
+            return 1
+        return 0
+
+    if args.export_model is not None:
+        generator = PasswordGenerator(autoload=False)
+        generator.use_numpy_inference = False
+        generator.load_model()
+        path = args.export_model or generator.inference_path
+        generator.export_inference_model(path)
+        print(f"[INFO] Inference model written to {path}.")
+        return 0
+
     root = tk.Tk()
     app = PasswordManagerGUI(root)
+    root.after_idle(report_startup_time)
     root.mainloop()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,312 @@
+"""
+Password policies shared by pass.py and password.py.
+
+A PasswordPolicy is compiled once from the generator settings (length range,
+enabled character classes, ambiguous-character filter). It holds one
+alphabet per character class and guarantees a minimum number of characters
+from each enabled class by construction, so generated passwords never need
+to be checked and repaired afterwards.
+
+Every password of a given length that satisfies the minimums is equally
+likely:
+
+- When a uniformly drawn password is likely enough to be valid, passwords are
+  drawn uniformly from the whole pool and invalid ones are redrawn
+  (rejection sampling over the valid set).
+- Otherwise the number of characters per class is drawn first, weighted by
+  how many valid passwords have that composition. Each class is then filled
+  uniformly from its alphabet and the result is securely shuffled.
+
+Both paths produce the uniform distribution over the valid passwords of the
+chosen length, so their entropy is exactly log2(valid_count(length)).
+"""
+import math
+import random
+import secrets
+import string
+from bisect import bisect_right
+
+RANDOM_READ_SIZE = 1 << 16  # Bytes requested from the OS per read
+REJECTION_MIN_ACCEPTANCE = 0.25  # Below this, build passwords from a drawn composition
+
+_system_random = random.SystemRandom()
+
+
+class Alphabet:
+    """
+    A set of ASCII characters that can be sampled from in bulk.
+
+    Randomness comes from large secrets.token_bytes reads that are mapped onto
+    the alphabet with bytes.translate. Bytes at or above the largest multiple
+    of the alphabet size are dropped, which keeps the mapping unbiased.
+    """
+    def __init__(self, chars):
+        if not chars:
+            raise ValueError("Character pool is empty.")
+        self.chars = chars
+        self.bytes = chars.encode('ascii')
+        size = len(self.bytes)
+        if size > 256:
+            raise ValueError("An alphabet can hold at most 256 characters.")
+        limit = 256 - 256 % size
+        self.table = bytes(self.bytes[i % size] for i in range(limit)) + bytes(256 - limit)
+        self.rejected = bytes(range(limit, 256))
+        self.acceptance = limit / 256
+        # Deleting these bytes from a password leaves only this alphabet's characters
+        self.others = bytes(c for c in range(256) if c not in self.bytes)
+
+    def __len__(self):
+        return len(self.bytes)
+
+    def sample(self, count):
+        """
+        Draws `count` characters uniformly and independently.
+
+        Returns:
+            bytes: The characters, ASCII encoded.
+        """
+        chunks = []
+        have = 0
+        while have < count:
+            # Over-request slightly so a single read usually suffices
+            want = min(int((count - have) / self.acceptance * 1.05) + 16, RANDOM_READ_SIZE)
+            chunk = secrets.token_bytes(want).translate(self.table, self.rejected)
+            chunks.append(chunk)
+            have += len(chunk)
+        return b''.join(chunks)[:count]
+
+
+class PasswordPolicy:
+    """
+    A compiled set of password rules.
+
+    Args:
+        classes (list[tuple[str, int]]): (alphabet, minimum count) for every
+            enabled character class. Alphabets must not overlap.
+        min_length (int): Minimum password length.
+        max_length (int): Maximum password length.
+
+    Raises:
+        ValueError: If no class is enabled, a class alphabet is empty, or the
+                    lengths cannot hold the required characters.
+    """
+    def __init__(self, classes, min_length, max_length):
+        if not classes:
+            raise ValueError("At least one character type must be selected.")
+        if not (min_length <= max_length):
+            raise ValueError("Minimum length must be less than or equal to maximum length.")
+        if min_length < 1:
+            raise ValueError("Minimum length must be at least 1.")
+        if any(minimum < 0 for _, minimum in classes):
+            raise ValueError("Minimum characters per type must not be negative.")
+        required = sum(minimum for _, minimum in classes)
+        if required > min_length:
+            raise ValueError(f"Minimum length must be at least {required} to include "
+                             f"every selected character type.")
+
+        self.alphabets = [Alphabet(chars) for chars, _ in classes]
+        self.min_counts = [minimum for _, minimum in classes]
+        self.pool = Alphabet(''.join(chars for chars, _ in classes))
+        if len(self.pool) != sum(len(a) for a in self.alphabets):
+            raise ValueError("Character classes must not overlap.")
+        self.min_length = min_length
+        self.max_length = max_length
+
+        self._valid_counts = {}   # (class index, length) -> number of valid strings
+        self._shortfall = {}      # class index -> inclusion-exclusion terms, see valid_count
+        self._cumulative = {}     # (class index, length) -> cumulative composition weights
+        self._acceptance = {}     # length -> acceptance(length)
+        self._checks = [(alphabet.others, minimum)
+                        for alphabet, minimum in zip(self.alphabets, self.min_counts) if minimum]
+
+    @classmethod
+    def from_flags(cls, min_length, max_length, include_uppercase=True, include_lowercase=True,
+                   include_numbers=True, include_special_chars=True, avoid_ambiguous_chars=True,
+                   ambiguous='l1o0iI', min_per_class=1):
+        """
+        Builds a policy from the flags used by the generators.
+
+        Args:
+            ambiguous (str): Characters removed when avoid_ambiguous_chars is set.
+            min_per_class (int): Characters required from every enabled class.
+        """
+        classes = []
+        for enabled, chars in ((include_uppercase, string.ascii_uppercase),
+                               (include_lowercase, string.ascii_lowercase),
+                               (include_numbers, string.digits),
+                               (include_special_chars, string.punctuation)):
+            if not enabled:
+                continue
+            if avoid_ambiguous_chars:
+                chars = ''.join(c for c in chars if c not in ambiguous)
+            classes.append((chars, min_per_class))
+        return cls(classes, min_length, max_length)
+
+    def valid_count(self, length, first_class=0):
+        """
+        Number of strings of `length` over the classes from `first_class` on
+        that contain at least the required number of characters per class.
+
+        Inclusion-exclusion over the sets of classes that fall short of their
+        minimum (see _shortfall_terms): the cost per length is 2**classes
+        times the total of the minimums, independent of the length itself.
+        """
+        key = (first_class, length)
+        count = self._valid_counts.get(key)
+        if count is not None:
+            return count
+        count = 0
+        for sign, rest, short in self._shortfall_terms(first_class):
+            # Choose the j positions of the short classes, fill them, and
+            # fill the other positions from the remaining classes
+            count += sign * sum(math.comb(length, j) * ways * rest ** (length - j)
+                                for j, ways in enumerate(short[:length + 1]) if ways)
+        self._valid_counts[key] = count
+        return count
+
+    def _shortfall_terms(self, first_class):
+        """
+        One (sign, size of the other classes, counts) term per set of classes
+        from `first_class` on. counts[j] is the number of strings of length j
+        over the set in which every class appears fewer times than its
+        minimum; it is built one class at a time by polynomial convolution.
+        """
+        terms = self._shortfall.get(first_class)
+        if terms is not None:
+            return terms
+        sizes = [len(alphabet) for alphabet in self.alphabets[first_class:]]
+        terms = [(1, sum(sizes), [1])]
+        for size, minimum in zip(sizes, self.min_counts[first_class:]):
+            if not minimum:
+                continue  # A class without a minimum can never fall short
+            for sign, rest, short in list(terms):
+                counts = [0] * (len(short) + minimum - 1)
+                for j, ways in enumerate(short):
+                    if ways:
+                        for c in range(minimum):
+                            counts[j + c] += math.comb(j + c, c) * size ** c * ways
+                terms.append((-sign, rest - size, counts))
+        self._shortfall[first_class] = terms
+        return terms
+
+    def _composition_weights(self, index, length):
+        # Ways to use c characters of class `index`: choose their positions,
+        # fill them, and fill the remaining positions with the later classes
+        size = len(self.alphabets[index])
+        for c in range(self.min_counts[index], length + 1):
+            rest = self.valid_count(length - c, index + 1)
+            if rest:
+                yield c, math.comb(length, c) * size ** c * rest
+
+    def entropy_bits(self, length):
+        """Entropy in bits of a password of `length` drawn under this policy."""
+        return math.log2(self.valid_count(length))
+
+    def acceptance(self, length):
+        """Probability that a uniform draw of `length` from the pool is valid."""
+        acceptance = self._acceptance.get(length)
+        if acceptance is None:
+            acceptance = self._acceptance[length] = self.valid_count(length) / len(self.pool) ** length
+        return acceptance
+
+    def is_valid(self, password):
+        data = password.encode('ascii') if isinstance(password, str) else password
+        for others, minimum in self._checks:
+            if len(data.translate(None, others)) < minimum:
+                return False
+        return True
+
+    def random_length(self):
+        return random.randint(self.min_length, self.max_length)
+
+    def sample_composition(self, length):
+        """
+        Draws how many characters each class contributes to a password of
+        `length`, with probability proportional to the number of valid
+        passwords having that composition.
+        """
+        composition = []
+        for index in range(len(self.alphabets)):
+            if index == len(self.alphabets) - 1:
+                composition.append(length)
+                break
+            key = (index, length)
+            cumulative = self._cumulative.get(key)
+            if cumulative is None:
+                counts, totals, total = [], [], 0
+                for c, weight in self._composition_weights(index, length):
+                    total += weight
+                    counts.append(c)
+                    totals.append(total)
+                cumulative = self._cumulative[key] = (counts, totals)
+            counts, totals = cumulative
+            c = counts[bisect_right(totals, secrets.randbelow(totals[-1]))]
+            composition.append(c)
+            length -= c
+        return composition
+
+    def construct(self, length):
+        """Builds one valid password of `length` from a drawn composition."""
+        composition = self.sample_composition(length)
+        chars = bytearray()
+        for alphabet, count in zip(self.alphabets, composition):
+            chars += alphabet.sample(count)
+        _system_random.shuffle(chars)
+        return chars.decode('ascii')
+
+    def generate(self, length=None):
+        """Generates one password; its length is drawn when not given."""
+        return self.generate_many(1, [length] if length is not None else None)[0]
+
+    def generate_many(self, count, lengths=None):
+        """
+        Generates `count` passwords.
+
+        Args:
+            count (int): Number of passwords.
+            lengths (list[int], optional): Length of every password; drawn
+                from [min_length, max_length] when omitted.
+
+        Returns:
+            list[str]: The passwords.
+        """
+        if lengths is None:
+            lengths = [self.random_length() for _ in range(count)]
+        passwords = [None] * count
+        pending = []
+        for i, length in enumerate(lengths):
+            if self.acceptance(length) >= REJECTION_MIN_ACCEPTANCE:
+                pending.append(i)
+            else:
+                passwords[i] = self.construct(length)
+
+        # Rejection sampling: draw everything in bulk, redraw the invalid ones
+        check = bool(self._checks)
+        while pending:
+            chars = self.pool.sample(sum(lengths[i] for i in pending))
+            retry = []
+            pos = 0
+            for i in pending:
+                candidate = chars[pos:pos + lengths[i]]
+                pos += lengths[i]
+                if check and not self.is_valid(candidate):
+                    retry.append(i)
+                else:
+                    passwords[i] = candidate.decode('ascii')
+            pending = retry
+        return passwords
+
+    def iter_passwords(self, count, chunk_size=10000):
+        """
+        Lazily generates `count` passwords.
+
+        Yields:
+            list[str]: Chunks of at most `chunk_size` passwords.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1.")
+        remaining = count
+        while remaining > 0:
+            n = min(chunk_size, remaining)
+            remaining -= n
+            yield self.generate_many(n)
@@ -0,0 +1,481 @@
+"""
+Local password service holding one loaded strength model.
+
+Processes that need passwords or strength scores talk to a single server
+instead of each loading (or training) the model and importing scikit-learn:
+
+    python password_service.py                          # Unix socket ./password_service.sock
+    python password_service.py --tcp 127.0.0.1:8765     # or localhost TCP
+
+    from password_service import PasswordServiceClient
+    with PasswordServiceClient() as client:
+        client.score(['hunter2', 'x9$Kd!q2Lm#r'])
+        client.generate(5, min_length=16, max_length=20)
+        client.stats()
+
+The protocol is one JSON object per line in each direction. Requests carry
+an "id" that is echoed in the response, so a client may pipeline requests on
+one connection; responses can come back in any order.
+
+    {"id": 1, "op": "score", "passwords": ["..."]}     -> {"id": 1, "ok": true, "scores": [...]}
+    {"id": 2, "op": "generate", "count": 3, "settings": {"min_length": 16}}
+                                                       -> {"id": 2, "ok": true, "passwords": [...], "scores": [...]}
+    {"id": 3, "op": "stats"}                           -> {"id": 3, "ok": true, "stats": {...}}
+    failures                                           -> {"id": ..., "ok": false, "error": "..."}
+
+Score and generate requests arriving within `batch_window` seconds of each
+other are coalesced: the passwords to score and the new candidates of every
+request in the batch go through a single predict_proba call. The model runs
+on one worker thread, so the event loop keeps accepting requests meanwhile.
+When more than `max_pending` requests are waiting, new ones are refused
+with an "overloaded" error instead of queueing without bound. Generate
+requests are also refused when they ask for passwords longer than
+`max_length`, for more than `max_request_chars` characters in total, or for
+more than MAX_MIN_PER_CLASS characters of each type, so that no single
+request can hold the model thread for long.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import math
+import os
+import socket
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SOCKET_PATH = 'password_service.sock'
+BATCH_WINDOW = 0.005       # Seconds to wait for more requests to join a batch
+MAX_BATCH_ROWS = 8192      # Passwords scored per batch at most
+MAX_PENDING = 1000         # Requests waiting for a batch before new ones are refused
+MAX_REQUEST_ITEMS = 10000  # Passwords per score request, or count per generate request
+MAX_PASSWORD_LENGTH = 256  # Longest password a generate request may ask for
+MAX_REQUEST_CHARS = 1 << 20  # count * max_length per generate request
+MAX_MIN_PER_CLASS = 16     # Largest min_per_class a generate request may ask for
+LATENCY_WINDOW = 10000     # Recent requests kept for the latency percentiles
+
+# Generator settings a generate request may override
+GENERATE_SETTINGS = ('min_length', 'max_length', 'include_uppercase', 'include_lowercase',
+                     'include_numbers', 'include_special_chars', 'avoid_ambiguous_chars',
+                     'min_per_class')
+
+
+class ServiceError(Exception):
+    """A request the service refuses; the message is sent back to the client."""
+
+
+class Job:
+    __slots__ = ('op', 'passwords', 'count', 'settings', 'future', 'result', 'error')
+
+    def __init__(self, op, future, passwords=None, count=0, settings=None):
+        self.op = op
+        self.future = future
+        self.passwords = passwords
+        self.count = count
+        self.settings = settings or {}
+        self.result = None
+        self.error = None
+
+    @property
+    def rows(self):
+        return len(self.passwords) if self.op == 'score' else self.count
+
+
+class PasswordService:
+    """
+    Micro-batching front end for a password.PasswordGenerator.
+
+    Args:
+        generator (PasswordGenerator): Generator with its model loaded. It
+            is only used from the service's worker thread.
+        batch_window (float): Seconds a batch stays open for more requests.
+        max_batch_rows (int): Upper bound on passwords scored per batch.
+        max_pending (int): Waiting requests beyond which new ones are refused.
+        max_length (int): Upper bound on min_length and max_length of a
+            generate request.
+        max_request_chars (int): Upper bound on count * max_length of a
+            generate request.
+    """
+    def __init__(self, generator, batch_window=BATCH_WINDOW, max_batch_rows=MAX_BATCH_ROWS,
+                 max_pending=MAX_PENDING, max_length=MAX_PASSWORD_LENGTH,
+                 max_request_chars=MAX_REQUEST_CHARS):
+        self.generator = generator
+        self.defaults = {name: getattr(generator, name) for name in GENERATE_SETTINGS}
+        self.batch_window = batch_window
+        self.max_batch_rows = max_batch_rows
+        self.max_pending = max_pending
+        self.max_length = max_length
+        self.max_request_chars = max_request_chars
+        self.queue = deque()
+        self.wakeup = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-model')
+        self.batcher = None
+
+        self.started = time.monotonic()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {'requests': 0, 'refused': 0, 'errors': 0, 'batches': 0,
+                         'batched_requests': 0, 'scored': 0, 'generated': 0}
+        self.batch_seconds = 0.0
+
+    # Request handling
+
+    async def submit(self, op, **kwargs):
+        """Queues a score or generate job and waits for its result."""
+        if len(self.queue) >= self.max_pending:
+            self.counters['refused'] += 1
+            raise ServiceError("overloaded: too many pending requests")
+        job = Job(op, asyncio.get_running_loop().create_future(), **kwargs)
+        self.queue.append(job)
+        self.wakeup.set()
+        return await job.future
+
+    async def handle(self, request):
+        """Runs one decoded request and returns the response object."""
+        start = time.perf_counter()
+        self.counters['requests'] += 1
+        response = {'id': request.get('id') if isinstance(request, dict) else None}
+        try:
+            if not isinstance(request, dict):
+                raise ServiceError("request must be a JSON object")
+            op = request.get('op')
+            if op == 'score':
+                passwords = request.get('passwords')
+                if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+                    raise ServiceError("'passwords' must be a list of strings")
+                if len(passwords) > MAX_REQUEST_ITEMS:
+                    raise ServiceError(f"at most {MAX_REQUEST_ITEMS} passwords per request")
+                response['scores'] = await self.submit('score', passwords=passwords)
+            elif op == 'generate':
+                count = request.get('count', 1)
+                if type(count) is not int or not 1 <= count <= MAX_REQUEST_ITEMS:
+                    raise ServiceError(f"'count' must be an integer from 1 to {MAX_REQUEST_ITEMS}")
+                settings = request.get('settings') or {}
+                unknown = set(settings) - set(GENERATE_SETTINGS) if isinstance(settings, dict) else None
+                if unknown is None or unknown:
+                    raise ServiceError(f"unknown settings: {sorted(unknown or [])}"
+                                       if unknown else "'settings' must be an object")
+                for name, value in settings.items():
+                    expected = bool if name.startswith(('include_', 'avoid_')) else int
+                    if type(value) is not expected:
+                        raise ServiceError(f"setting {name!r} must be {'a boolean' if expected is bool else 'an integer'}")
+                self.check_size(count, settings)
+                response['passwords'], response['scores'] = await self.submit(
+                    'generate', count=count, settings=settings)
+            elif op == 'stats':
+                response['stats'] = self.stats()
+            else:
+                raise ServiceError(f"unknown op {op!r}")
+            response['ok'] = True
+        except (ServiceError, ValueError) as e:
+            self.counters['errors'] += 1
+            response.update(ok=False, error=str(e))
+        except Exception as e:
+            self.counters['errors'] += 1
+            response.update(ok=False, error=f"internal error: {e}")
+        self.latencies.append(time.perf_counter() - start)
+        return response
+
+    def check_size(self, count, settings):
+        """Refuses generate requests beyond the length, size and per-type limits."""
+        merged = dict(self.defaults, **settings)
+        lengths = merged['min_length'], merged['max_length']
+        if max(lengths) > self.max_length:
+            raise ServiceError(f"password length is limited to {self.max_length}")
+        if count * lengths[1] > self.max_request_chars:
+            raise ServiceError(f"'count' * max_length is limited to {self.max_request_chars}")
+        min_per_class = merged['min_per_class']
+        if not 0 <= min_per_class <= MAX_MIN_PER_CLASS:
+            raise ServiceError(f"'min_per_class' must be from 0 to {MAX_MIN_PER_CLASS}")
+        classes = sum(merged[name] for name in GENERATE_SETTINGS if name.startswith('include_'))
+        if min_per_class * classes > lengths[0]:
+            raise ServiceError("'min_per_class' times the selected character types exceeds min_length")
+
+    # Batching
+
+    async def run_batches(self):
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            # Leave the batch open briefly so concurrent requests can join it
+            await asyncio.sleep(self.batch_window)
+            batch, rows = [], 0
+            while self.queue and (not batch or rows + self.queue[0].rows <= self.max_batch_rows):
+                job = self.queue.popleft()
+                if job.future.cancelled():
+                    continue
+                batch.append(job)
+                rows += job.rows
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                await asyncio.get_running_loop().run_in_executor(self.executor, self.process_batch, batch)
+            except Exception as e:
+                for job in batch:
+                    job.error = job.error or e
+            self.batch_seconds += time.perf_counter() - start
+            self.counters['batches'] += 1
+            self.counters['batched_requests'] += len(batch)
+            for job in batch:
+                if job.future.done():
+                    continue
+                if job.error is not None:
+                    job.future.set_exception(job.error)
+                else:
+                    job.future.set_result(job.result)
+
+    def process_batch(self, batch):
+        """Runs on the model thread: one predict_proba call for the whole batch."""
+        generator = self.generator
+        rows, owners = [], []  # owners[i]: (job, number of rows) in row order
+        entropy_bits = []  # Policy entropy of generated candidates, NaN for submitted passwords
+        candidates = {}
+        for job in batch:
+            if job.op == 'score':
+                rows.extend(job.passwords)
+                entropy_bits.extend([math.nan] * len(job.passwords))
+                owners.append((job, len(job.passwords)))
+                continue
+            try:
+                policy = self.policy_for(job.settings)
+            except ValueError as e:
+                job.error = e
+                continue
+            candidates[job] = policy.generate_many(job.count)
+            rows.extend(candidates[job])
+            entropy_bits.extend(generator.policy_entropy_bits(policy, candidates[job]))
+            owners.append((job, job.count))
+
+        scores = generator.score_passwords(rows, entropy_bits) if rows else []
+        pos = 0
+        for job, n in owners:
+            job_scores = scores[pos:pos + n]
+            pos += n
+            if job.op == 'score':
+                job.result = [float(s) for s in job_scores]
+                self.counters['scored'] += n
+                continue
+            # Strengthen this request's weak candidates under its own settings
+            passwords = candidates[job]
+            self.apply_settings(job.settings)
+            if (job_scores < generator.strength_threshold).any():
+                passwords, job_scores = generator.strengthen_batch(passwords, job_scores)
+            # Blocklisted passwords are replaced after scoring; score their replacements
+            screened = generator.screen(list(passwords))
+            replaced = [i for i, (old, new) in enumerate(zip(passwords, screened)) if old != new]
+            job_scores = [float(s) for s in job_scores]
+            if replaced:
+                new = [screened[i] for i in replaced]
+                new_scores = generator.score_passwords(new, generator.policy_entropy_bits(generator.get_policy(), new))
+                for i, score in zip(replaced, new_scores):
+                    job_scores[i] = float(score)
+            job.result = (screened, job_scores)
+            self.counters['generated'] += n
+
+    def apply_settings(self, settings):
+        for name in GENERATE_SETTINGS:
+            setattr(self.generator, name, settings.get(name, self.defaults[name]))
+
+    def policy_for(self, settings):
+        self.apply_settings(settings)
+        return self.generator.get_policy()
+
+    # Metrics
+
+    def stats(self):
+        """Request counts, batching, queue depth, latency percentiles and throughput."""
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+
+        counters = dict(self.counters)
+        batches = counters['batches']
+        return {
+            'uptime_s': uptime,
+            'counters': counters,
+            'pending': len(self.queue),
+            'mean_batch_requests': counters['batched_requests'] / batches if batches else 0.0,
+            'mean_batch_s': self.batch_seconds / batches if batches else 0.0,
+            'latency_s': {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99),
+                          'max': latencies[-1] if latencies else 0.0},
+            'passwords_per_second': (counters['scored'] + counters['generated']) / uptime if uptime else 0.0,
+            'model_status': self.generator.model_status,
+        }
+
+    # Transport
+
+    async def handle_connection(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'id': None, 'ok': False, 'error': "invalid JSON"}
+            else:
+                response = await self.handle(request)
+            data = json.dumps(response).encode('utf-8') + b'\n'
+            async with write_lock:
+                writer.write(data)
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(respond(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def serve(self, path=DEFAULT_SOCKET_PATH, host=None, port=None, ready=None):
+        """
+        Serves until cancelled, on the Unix socket `path`, or on host:port
+        when a port is given. `ready` (an asyncio.Event) is set once listening.
+        """
+        self.wakeup = asyncio.Event()
+        self.batcher = asyncio.create_task(self.run_batches())
+        if port is not None:
+            server = await asyncio.start_server(self.handle_connection, host or '127.0.0.1', port,
+                                                limit=1 << 24)
+        else:
+            if os.path.exists(path):
+                os.unlink(path)  # Left over from a previous run
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=1 << 24)
+        try:
+            async with server:
+                if ready is not None:
+                    ready.set()
+                await server.serve_forever()
+        finally:
+            self.batcher.cancel()
+            self.executor.shutdown(wait=False)
+            if port is None and os.path.exists(path):
+                os.unlink(path)
+
+
+class PasswordServiceClient:
+    """
+    Blocking client for a running PasswordService.
+
+    Args:
+        path (str): Unix socket of the service (ignored when port is given).
+        host (str): Host of a TCP service.
+        port (int, optional): Port of a TCP service.
+        timeout (float): Socket timeout in seconds.
+
+    Raises:
+        RuntimeError: From the calls, when the service answers with an error.
+    """
+    def __init__(self, path=DEFAULT_SOCKET_PATH, host='127.0.0.1', port=None, timeout=30.0):
+        if port is not None:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        else:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        self.file = self.sock.makefile('rwb')
+        self.ids = itertools.count(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def request(self, op, **fields):
+        request_id = next(self.ids)
+        self.file.write(json.dumps({'id': request_id, 'op': op, **fields}).encode('utf-8') + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The password service closed the connection.")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error', "request failed"))
+        return response
+
+    def score(self, passwords):
+        """Strength probability of each password."""
+        return self.request('score', passwords=list(passwords))['scores']
+
+    def generate(self, count=1, **settings):
+        """
+        Generates `count` passwords; keyword arguments override generator
+        settings such as min_length or include_special_chars.
+
+        Returns:
+            tuple: (passwords, strength probabilities)
+        """
+        response = self.request('generate', count=count, settings=settings)
+        return response['passwords'], response['scores']
+
+    def stats(self):
+        return self.request('stats')['stats']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve password generation and strength scoring locally.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH,
+                        help=f"Unix socket path (default: {DEFAULT_SOCKET_PATH})")
+    parser.add_argument('--tcp', metavar='HOST:PORT', help="listen on localhost TCP instead of a Unix socket")
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW,
+                        help=f"seconds a batch stays open for more requests (default: {BATCH_WINDOW})")
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH_ROWS,
+                        help=f"passwords scored per batch at most (default: {MAX_BATCH_ROWS})")
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING,
+                        help=f"waiting requests before new ones are refused (default: {MAX_PENDING})")
+    parser.add_argument('--max-length', type=int, default=MAX_PASSWORD_LENGTH,
+                        help=f"longest password a generate request may ask for (default: {MAX_PASSWORD_LENGTH})")
+    parser.add_argument('--max-request-chars', type=int, default=MAX_REQUEST_CHARS,
+                        help=f"count * max_length allowed per generate request (default: {MAX_REQUEST_CHARS})")
+    parser.add_argument('--blocklist', metavar='PATH', help="replace generated passwords found in this blocklist")
+    args = parser.parse_args(argv)
+
+    host = port = None
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(':')
+        try:
+            port = int(port)
+        except ValueError:
+            parser.error("--tcp expects HOST:PORT")
+
+    from password import PasswordGenerator
+    generator = PasswordGenerator(autoload=True)
+    if args.blocklist:
+        generator.load_blocklist(args.blocklist)
+    service = PasswordService(generator, args.batch_window, args.max_batch, args.max_pending,
+                              args.max_length, args.max_request_chars)
+    print(f"[INFO] Serving on {args.tcp or args.socket}")
+    try:
+        asyncio.run(service.serve(args.socket, host, port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
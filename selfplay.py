@@ -0,0 +1,239 @@
+"""
+Headless tic-tac-toe self-play.
+
+Plays large numbers of 3x3 games between configurable agents and reports
+the outcomes and throughput, without opening a window:
+
+    python selfplay.py -n 1000000 --x perfect --o epsilon:0.2
+    python selfplay.py -n 100000 --x random --o perfect --first alternate --json
+
+Agents:
+    perfect        the tic-tac-toe AI (opening book, or search without one)
+    random         a uniformly random empty cell
+    epsilon[:E]    random with probability E (default 0.1), otherwise perfect
+
+Games are split into chunks with their own RNG stream derived from --seed,
+so results only depend on the seed, count and chunk size, not on how many
+worker processes play them. The exit status is 1 if a perfect agent ever
+lost, which makes the script usable as a playing-strength regression check.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tictac import (BIT_INDEX, FULL_MASK, IS_WIN, TranspositionTable, find_best_move_bits,
+                    find_best_move_bits_for_o, get_opening_book)
+
+SELFPLAY_CHUNK_SIZE = 20000  # Games per task handed to a worker process
+DEFAULT_EPSILON = 0.1
+
+# EMPTY_CELLS[occupied] lists the free cell indices of a position
+EMPTY_CELLS = tuple(tuple(i for i in range(9) if not occupied >> i & 1) for occupied in range(512))
+
+
+class PerfectAgent:
+    """Plays the minimax-optimal move; uses the opening book when it is available."""
+    name = 'perfect'
+    perfect = True
+
+    def __init__(self):
+        self.book = get_opening_book()
+        self.table = TranspositionTable()
+
+    def choose(self, x, o, player, rng):
+        if self.book is not None:
+            return self.book.entry(x, o, player)[0]
+        if player == 'X':
+            return BIT_INDEX[find_best_move_bits(x, o, self.table)]
+        return BIT_INDEX[find_best_move_bits_for_o(x, o, self.table)]
+
+
+class RandomAgent:
+    name = 'random'
+    perfect = False
+
+    def choose(self, x, o, player, rng):
+        return rng.choice(EMPTY_CELLS[x | o])
+
+
+class EpsilonGreedyAgent:
+    """Random move with probability epsilon, otherwise the perfect move."""
+    perfect = False
+
+    def __init__(self, epsilon=DEFAULT_EPSILON):
+        if not 0 <= epsilon <= 1:
+            raise ValueError("Epsilon must be between 0 and 1.")
+        self.epsilon = epsilon
+        self.name = f'epsilon:{epsilon:g}'
+        self.greedy = PerfectAgent()
+
+    def choose(self, x, o, player, rng):
+        if rng.random() < self.epsilon:
+            return rng.choice(EMPTY_CELLS[x | o])
+        return self.greedy.choose(x, o, player, rng)
+
+
+def make_agent(spec):
+    """Builds an agent from its command-line name: perfect, random or epsilon[:E]."""
+    name, _, arg = spec.partition(':')
+    if name == 'perfect' and not arg:
+        return PerfectAgent()
+    if name == 'random' and not arg:
+        return RandomAgent()
+    if name == 'epsilon':
+        try:
+            epsilon = float(arg) if arg else DEFAULT_EPSILON
+        except ValueError:
+            raise ValueError(f"Invalid epsilon in agent {spec!r}.") from None
+        return EpsilonGreedyAgent(epsilon)
+    raise ValueError(f"Unknown agent {spec!r}; use perfect, random or epsilon[:E].")
+
+
+def play_game(x_agent, o_agent, first, rng):
+    """
+    Plays one game from an empty board.
+
+    Returns:
+        tuple: (winner 'X', 'O' or None for a draw, number of moves)
+    """
+    x = o = 0
+    player = first
+    moves = 0
+    while True:
+        moves += 1
+        if player == 'X':
+            x |= 1 << x_agent.choose(x, o, 'X', rng)
+            if IS_WIN[x]:
+                return 'X', moves
+            player = 'O'
+        else:
+            o |= 1 << o_agent.choose(x, o, 'O', rng)
+            if IS_WIN[o]:
+                return 'O', moves
+            player = 'X'
+        if x | o == FULL_MASK:
+            return None, moves
+
+
+def play_chunk(task):
+    """Plays one chunk of games; runs in the worker processes."""
+    x_spec, o_spec, first, seed, start, count = task
+    x_agent, o_agent = make_agent(x_spec), make_agent(o_spec)
+    rng = random.Random(None if seed is None else f"{seed}/{start}")
+    wins = {'X': 0, 'O': 0, None: 0}
+    total_moves = 0
+    for game in range(start, start + count):
+        if first == 'alternate':
+            starter = 'X' if game % 2 == 0 else 'O'
+        else:
+            starter = first
+        winner, moves = play_game(x_agent, o_agent, starter, rng)
+        wins[winner] += 1
+        total_moves += moves
+    return wins['X'], wins['O'], wins[None], total_moves
+
+
+def simulate(games, x_agent='perfect', o_agent='perfect', first='alternate', seed=None,
+             workers=None, chunk_size=SELFPLAY_CHUNK_SIZE):
+    """
+    Plays `games` games and returns aggregate statistics.
+
+    Args:
+        x_agent (str): Agent spec for X, see make_agent().
+        o_agent (str): Agent spec for O.
+        first (str): 'X', 'O' or 'alternate' (X starts the even-numbered games).
+        seed (int, optional): Seed for reproducible runs.
+        workers (int, optional): Worker processes (default: one per CPU).
+        chunk_size (int): Games per task.
+
+    Returns:
+        dict: Outcome counts and rates, mean game length, perfect-agent
+              losses, elapsed time and games per second.
+    """
+    if first not in ('X', 'O', 'alternate'):
+        raise ValueError("First player must be X, O or alternate.")
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be at least 1.")
+    # Fail on bad specs here rather than inside a worker
+    agents = {'X': make_agent(x_agent), 'O': make_agent(o_agent)}
+
+    tasks = [(x_agent, o_agent, first, seed, start, min(chunk_size, games - start))
+             for start in range(0, games, chunk_size)]
+    start_time = time.perf_counter()
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(play_chunk, tasks))
+    else:
+        results = [play_chunk(task) for task in tasks]
+    elapsed = time.perf_counter() - start_time
+
+    x_wins = sum(r[0] for r in results)
+    o_wins = sum(r[1] for r in results)
+    draws = sum(r[2] for r in results)
+    total_moves = sum(r[3] for r in results)
+    perfect_losses = ((o_wins if agents['X'].perfect else 0) +
+                      (x_wins if agents['O'].perfect else 0))
+    return {
+        'games': games,
+        'x_agent': agents['X'].name,
+        'o_agent': agents['O'].name,
+        'first': first,
+        'seed': seed,
+        'workers': max(workers, 1),
+        'x_wins': x_wins,
+        'o_wins': o_wins,
+        'draws': draws,
+        'x_win_rate': x_wins / games if games else 0.0,
+        'o_win_rate': o_wins / games if games else 0.0,
+        'draw_rate': draws / games if games else 0.0,
+        'mean_moves': total_moves / games if games else 0.0,
+        'perfect_losses': perfect_losses,
+        'elapsed_s': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe games between AI agents without a GUI.")
+    parser.add_argument('-n', '--games', type=int, default=100000, help="number of games (default: 100000)")
+    parser.add_argument('--x', default='perfect', metavar='AGENT', help="agent playing X (default: perfect)")
+    parser.add_argument('--o', default='perfect', metavar='AGENT', help="agent playing O (default: perfect)")
+    parser.add_argument('--first', choices=('X', 'O', 'alternate'), default='alternate',
+                        help="who moves first (default: alternate)")
+    parser.add_argument('--seed', type=int, help="seed for reproducible runs")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=SELFPLAY_CHUNK_SIZE, help="games per worker task")
+    parser.add_argument('--json', action='store_true', help="print the statistics as JSON")
+    args = parser.parse_args(argv)
+    if args.games < 0:
+        parser.error("--games must not be negative")
+
+    try:
+        stats = simulate(args.games, args.x, args.o, args.first, args.seed, args.workers, args.chunk_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(f"{stats['games']} games, {stats['x_agent']} (X) vs {stats['o_agent']} (O), "
+              f"first: {stats['first']}")
+        print(f"  X wins: {stats['x_wins']:>10} ({stats['x_win_rate']:.2%})")
+        print(f"  O wins: {stats['o_wins']:>10} ({stats['o_win_rate']:.2%})")
+        print(f"  Draws:  {stats['draws']:>10} ({stats['draw_rate']:.2%})")
+        print(f"  Mean game length: {stats['mean_moves']:.2f} moves")
+        print(f"  {stats['games_per_second']:,.0f} games/s on {stats['workers']} worker(s), "
+              f"{stats['elapsed_s']:.2f}s")
+    if stats['perfect_losses']:
+        print(f"[ERROR] A perfect agent lost {stats['perfect_losses']} game(s).", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+NumPy-only inference for the password strength model.
+
+NumpyStrengthModel replays the forward pass of password.py's StandardScaler
++ MLPClassifier pair from a versioned, uncompressed .npz file. The file is
+memory-mapped when loaded, and neither loading nor scoring imports
+scikit-learn. password.py and model_registry.py both write and read this
+format, which is why it lives in its own module.
+"""
+
+INFERENCE_FORMAT_VERSION = 1
+
+
+def load_npz_arrays(path, mmap=True):
+    """
+    Reads every array of an uncompressed .npz file. With mmap=True the arrays
+    are memory-mapped straight out of the archive instead of being copied.
+    """
+    import zipfile
+    import struct
+    import numpy as np
+
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            # Skip the local file header to reach the .npy payload
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack('<HH', header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if not shape or dtype.hasobject:
+                arrays[name] = np.load(archive.open(info))
+                continue
+            mapped = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                               order='F' if fortran_order else 'C')
+            arrays[name] = mapped.view(np.ndarray)  # Plain ndarray view, still file-backed
+    return arrays
+
+
+class NumpyStrengthModel:
+    """
+    Pure-NumPy forward pass of the StandardScaler + MLPClassifier pair.
+
+    It offers the two calls PasswordGenerator makes on the sklearn objects,
+    transform() and predict_proba(), so an instance can stand in for both.
+    The parameters live in a versioned, uncompressed .npz file that can be
+    memory-mapped; loading it does not import scikit-learn.
+    """
+    def __init__(self, mean, scale, coefs, intercepts):
+        self.mean = mean
+        self.scale = scale
+        self.coefs = list(coefs)
+        self.intercepts = list(intercepts)
+
+    @classmethod
+    def from_sklearn(cls, model, scaler):
+        if model.activation != 'relu' or model.out_activation_ != 'logistic':
+            raise ValueError("Only ReLU MLPs with a logistic output can be exported.")
+        return cls(scaler.mean_, scaler.scale_, model.coefs_, model.intercepts_)
+
+    def save(self, path):
+        import numpy as np
+        arrays = {
+            'format_version': np.array([INFERENCE_FORMAT_VERSION], dtype=np.int32),
+            'mean': np.asarray(self.mean, dtype=np.float64),
+            'scale': np.asarray(self.scale, dtype=np.float64),
+        }
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            arrays[f'coef_{i}'] = np.asarray(coef, dtype=np.float64)
+            arrays[f'intercept_{i}'] = np.asarray(intercept, dtype=np.float64)
+        # Written uncompressed so that load() can memory-map the arrays
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        arrays = load_npz_arrays(path, mmap)
+        version = int(arrays['format_version'][0])
+        if version != INFERENCE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported inference model version {version} "
+                             f"(expected {INFERENCE_FORMAT_VERSION}).")
+        layers = sum(1 for name in arrays if name.startswith('coef_'))
+        return cls(arrays['mean'], arrays['scale'],
+                   [arrays[f'coef_{i}'] for i in range(layers)],
+                   [arrays[f'intercept_{i}'] for i in range(layers)])
+
+    def transform(self, X):
+        import numpy as np
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def predict_proba(self, X_scaled):
+        import numpy as np
+        activation = X_scaled
+        last = len(self.coefs) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs, self.intercepts)):
+            activation = activation @ coef
+            activation += intercept
+            if i < last:
+                np.maximum(activation, 0, out=activation)
+        # Logistic output, clipped like sklearn to avoid overflow in exp
+        strong = 1.0 / (1.0 + np.exp(-np.clip(activation[:, 0], -500, 500)))
+        return np.column_stack((1.0 - strong, strong))
+
+    def score(self, X):
+        """Probability of being strong for each row of raw features."""
+        return self.predict_proba(self.transform(X))[:, 1]
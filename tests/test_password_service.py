@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from password_service import MAX_MIN_PER_CLASS, PasswordService
+
+
+def make_service():
+    # Only the generator's settings are read before a request reaches the model
+    generator = SimpleNamespace(min_length=10, max_length=128, include_uppercase=True,
+                                include_lowercase=True, include_numbers=True,
+                                include_special_chars=True, avoid_ambiguous_chars=True,
+                                min_per_class=1)
+    service = PasswordService(generator)
+    submitted = []
+
+    async def submit(op, **kwargs):
+        submitted.append((op, kwargs))
+        return [], []
+
+    service.submit = submit
+    return service, submitted
+
+
+def generate(service, count=1, **settings):
+    return asyncio.run(service.handle({'id': 1, 'op': 'generate', 'count': count, 'settings': settings}))
+
+
+@pytest.mark.parametrize('count, settings', [
+    (1, {'min_per_class': 40, 'min_length': 160, 'max_length': 160}),
+    (1, {'min_per_class': MAX_MIN_PER_CLASS + 1, 'min_length': 200, 'max_length': 200}),
+    (1, {'min_per_class': -1}),
+    (1, {'min_per_class': 5, 'min_length': 12, 'max_length': 12}),
+    (1, {'min_length': 3000, 'max_length': 3000}),
+    (10000, {'max_length': 200}),
+    (True, {}),
+])
+def test_oversized_generate_requests_are_refused(count, settings):
+    service, submitted = make_service()
+    response = generate(service, count, **settings)
+    assert response['ok'] is False
+    assert submitted == []
+
+
+def test_generate_request_within_limits_is_queued():
+    service, submitted = make_service()
+    response = generate(service, 5, min_per_class=MAX_MIN_PER_CLASS, min_length=64, max_length=64)
+    assert response['ok'] is True
+    assert submitted == [('generate', {'count': 5, 'settings': {
+        'min_per_class': MAX_MIN_PER_CLASS, 'min_length': 64, 'max_length': 64}})]
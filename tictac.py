@@ -1,82 +1,710 @@
 import tkinter as tk
 from tkinter import messagebox
 import random
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
 
 
 def get_empty_cells(board):
-    return [(r, c) for r in range(3) for c in range(3) if board[r][c] == ' ']
+    n = len(board)
+    return [(r, c) for r in range(n) for c in range(n) if board[r][c] == ' ']
 
 
-def check_win(board, player):
-    # Check rows and columns
-    for i in range(3):
-        if all(board[i][j] == player for j in range(3)) or all(board[j][i] == player for j in range(3)):
+DEFAULT_MAX_WIN_LENGTH = 4  # Marks in a row to win when not given, on boards larger than 4x4
+
+_lines_cache = {}
+
+
+def default_win_length(size):
+    """Win length used when none is given: the board size, capped at DEFAULT_MAX_WIN_LENGTH."""
+    return min(size, DEFAULT_MAX_WIN_LENGTH)
+
+
+def winning_lines(size, win_length):
+    """Every run of win_length cells (rows, columns, both diagonals) on a size x size board."""
+    lines = _lines_cache.get((size, win_length))
+    if lines is None:
+        lines = []
+        for r in range(size):
+            for c in range(size):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (win_length - 1), c + dc * (win_length - 1)
+                    if 0 <= end_r < size and 0 <= end_c < size:
+                        lines.append(tuple((r + dr * i, c + dc * i) for i in range(win_length)))
+        _lines_cache[(size, win_length)] = lines
+    return lines
+
+
+def check_win(board, player, win_length=None):
+    # Check rows, columns and diagonals
+    for line in winning_lines(len(board), win_length or default_win_length(len(board))):
+        if all(board[r][c] == player for r, c in line):
             return True
-    # Check diagonals
-    return (board[0][0] == board[1][1] == board[2][2] == player) or \
-           (board[0][2] == board[1][1] == board[2][0] == player)
+    return False
 
 
 def is_board_full(board):
-    return all(board[r][c] != ' ' for r in range(3) for c in range(3))
+    return all(cell != ' ' for row in board for cell in row)
+
+
+def build_symmetries():
+    """The 8 rotations/reflections of the board as permutations of the row-major cells."""
+    transforms = (lambda r, c: (r, c), lambda r, c: (c, 2 - r), lambda r, c: (2 - r, 2 - c),
+                  lambda r, c: (2 - c, r), lambda r, c: (r, 2 - c), lambda r, c: (2 - r, c),
+                  lambda r, c: (c, r), lambda r, c: (2 - c, 2 - r))
+    symmetries = []
+    for transform in transforms:
+        perm = []
+        for i in range(9):
+            r, c = transform(i // 3, i % 3)
+            perm.append(3 * r + c)
+        symmetries.append(tuple(perm))
+    return symmetries
+
+
+SYMMETRIES = build_symmetries()
+
+
+# Bitboards: a board is a pair of 9-bit integers (X cells, O cells), with
+# bit 3 * row + col set for every occupied cell.
+FULL_MASK = 0x1FF
+WIN_MASKS = (0b000000111, 0b000111000, 0b111000000,   # rows
+             0b001001001, 0b010010010, 0b100100100,   # columns
+             0b100010001, 0b001010100)                # diagonals
+IS_WIN = tuple(any(bits & mask == mask for mask in WIN_MASKS) for bits in range(512))
+CELLS = tuple((i // 3, i % 3) for i in range(9))
+BIT_INDEX = {1 << i: i for i in range(9)}
+
+# SYMMETRY_TABLES[s][bits] is `bits` mapped through symmetry s
+SYMMETRY_TABLES = tuple(
+    tuple(sum(1 << perm[i] for i in range(9) if bits >> i & 1) for bits in range(512))
+    for perm in SYMMETRIES)
+
+
+def board_to_bits(board):
+    x = o = 0
+    for i, (r, c) in enumerate(CELLS):
+        if board[r][c] == 'X':
+            x |= 1 << i
+        elif board[r][c] == 'O':
+            o |= 1 << i
+    return x, o
+
+
+def bits_to_board(x, o):
+    board = [[' '] * 3 for _ in range(3)]
+    for i, (r, c) in enumerate(CELLS):
+        if x >> i & 1:
+            board[r][c] = 'X'
+        elif o >> i & 1:
+            board[r][c] = 'O'
+    return board
 
 
-def minimax(board, depth, is_maximizing):
-    if check_win(board, 'X'):
-        return 10 - depth
-    if check_win(board, 'O'):
-        return -10 + depth
-    if is_board_full(board):
-        return 0
+def bits_full(x, o):
+    return x | o == FULL_MASK
 
-    if is_maximizing:
-        best_score = -float('inf')
-        for r, c in get_empty_cells(board):
-            board[r][c] = 'X'
-            score = minimax(board, depth + 1, False)
-            board[r][c] = ' '
-            best_score = max(best_score, score)
-        return best_score
+
+def iter_empty_bits(x, o):
+    """Yields the empty cells as single-bit masks, in row-major order."""
+    empty = FULL_MASK & ~(x | o)
+    while empty:
+        low = empty & -empty
+        yield low
+        empty ^= low
+
+
+def canonical_key(x, o):
+    """The smallest encoding of the position over its 8 symmetries."""
+    return min(table[x] << 9 | table[o] for table in SYMMETRY_TABLES)
+
+
+class TranspositionTable:
+    """
+    LRU-bounded cache of minimax values keyed on (canonical board, side to move).
+
+    Values are stored relative to the position (as if searched at depth 0)
+    so one entry serves the position at any depth. The table lives for the
+    whole session, across moves and games; hits, misses and nodes count the
+    lookups and the positions actually expanded.
+    """
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.nodes = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.nodes = 0
+
+    def stats(self):
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses, 'nodes': self.nodes}
+
+
+transposition_table = TranspositionTable()
+
+
+def shift_score(score, depth):
+    # Wins and losses found `depth` plies further away are worth 1 less per ply
+    if score > 0:
+        return score - depth
+    if score < 0:
+        return score + depth
+    return 0
+
+
+def search(x, o, is_maximizing, table):
+    key = canonical_key(x, o) << 1 | is_maximizing
+    cached = table.get(key)
+    if cached is not None:
+        return cached
+    table.nodes += 1
+
+    if IS_WIN[x]:
+        score = 10
+    elif IS_WIN[o]:
+        score = -10
+    elif x | o == FULL_MASK:
+        score = 0
+    elif is_maximizing:
+        score = -float('inf')
+        for move in iter_empty_bits(x, o):
+            score = max(score, shift_score(search(x | move, o, False, table), 1))
     else:
-        best_score = float('inf')
-        for r, c in get_empty_cells(board):
-            board[r][c] = 'O'
-            score = minimax(board, depth + 1, True)
-            board[r][c] = ' '
-            best_score = min(best_score, score)
-        return best_score
+        score = float('inf')
+        for move in iter_empty_bits(x, o):
+            score = min(score, shift_score(search(x, o | move, True, table), 1))
+
+    table.put(key, score)
+    return score
+
 
+def minimax(board, depth, is_maximizing, table=None):
+    if table is None:
+        table = transposition_table
+    x, o = board_to_bits(board)
+    return shift_score(search(x, o, is_maximizing, table), depth)
 
-def find_best_move(board):
+
+def find_best_move_bits(x, o, table=None):
+    """Best move for X as a single-bit mask, or None on a full board."""
+    if table is None:
+        table = transposition_table
     best_move = None
     best_score = -float('inf')
-    for r, c in get_empty_cells(board):
-        board[r][c] = 'X'
-        score = minimax(board, 0, False)
-        board[r][c] = ' '
+    for move in iter_empty_bits(x, o):
+        score = search(x | move, o, False, table)
         if score > best_score:
             best_score = score
-            best_move = (r, c)
+            best_move = move
+    return best_move
+
+
+def find_best_move_bits_for_o(x, o, table=None):
+    """Best move for O as a single-bit mask, or None on a full board."""
+    if table is None:
+        table = transposition_table
+    best_move = None
+    best_score = float('inf')
+    for move in iter_empty_bits(x, o):
+        score = search(x, o | move, True, table)
+        if score < best_score:
+            best_score = score
+            best_move = move
     return best_move
 
 
+def find_best_move(board, table=None, use_book=True):
+    x, o = board_to_bits(board)
+    if use_book and table is None:
+        book = get_opening_book()
+        # Positions the book has no move for (over, or unreachable from the
+        # empty board) are searched like without a book
+        move = None if book is None else book.best_move(x, o, 'X')
+        if move is not None:
+            return move
+    move = find_best_move_bits(x, o, table)
+    return None if move is None else CELLS[BIT_INDEX[move]]
+
+
+# Opening book: the solved 3x3 game as a binary table, one entry per board
+# and side to move. The index is the board read as a base-3 number (cell i
+# contributes 3**i for X, 2 * 3**i for O), times 2, plus 1 when O is to move.
+# Each entry is two bytes: the best move's cell (NO_MOVE when the game is
+# over or the position unreachable) and the game value as a signed byte,
+# scored for X like minimax(). The payload follows a header carrying its
+# CRC-32.
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictac_book.bin')
+BOOK_MAGIC = b'TTTBOOK\0'
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct('<8sHHII')  # magic, version, entry size, entries, payload CRC-32
+BOOK_ENTRIES = 2 * 3 ** 9
+NO_MOVE = 0xFF
+TERNARY = tuple(sum(3 ** i for i in range(9) if bits >> i & 1) for bits in range(512))
+
+
+def book_index(x, o, player):
+    return (TERNARY[x] + 2 * TERNARY[o]) * 2 + (player == 'O')
+
+
+def build_opening_book():
+    """Solves every position reachable with either side moving first; returns the payload."""
+    table = TranspositionTable()
+    payload = bytearray([NO_MOVE, 0]) * BOOK_ENTRIES
+    seen = set()
+    pending = [(0, 0, 'X'), (0, 0, 'O')]
+    while pending:
+        x, o, player = pending.pop()
+        if (x, o, player) in seen:
+            continue
+        seen.add((x, o, player))
+        index = book_index(x, o, player)
+        payload[2 * index + 1] = search(x, o, player == 'X', table) & 0xFF
+        if IS_WIN[x] or IS_WIN[o] or x | o == FULL_MASK:
+            continue
+        if player == 'X':
+            payload[2 * index] = BIT_INDEX[find_best_move_bits(x, o, table)]
+            pending.extend((x | move, o, 'O') for move in iter_empty_bits(x, o))
+        else:
+            payload[2 * index] = BIT_INDEX[find_best_move_bits_for_o(x, o, table)]
+            pending.extend((x, o | move, 'X') for move in iter_empty_bits(x, o))
+    return bytes(payload)
+
+
+def write_opening_book(path=BOOK_PATH):
+    payload = build_opening_book()
+    header = BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, 2, BOOK_ENTRIES, zlib.crc32(payload))
+    with open(path, 'wb') as f:
+        f.write(header + payload)
+    return path
+
+
+class OpeningBook:
+    """
+    A memory-mapped opening book; every lookup is a single table read.
+
+    Raises:
+        OSError: If the file cannot be opened.
+        ValueError: If the header is wrong or the checksum does not match.
+    """
+    def __init__(self, path=BOOK_PATH):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.data) != BOOK_HEADER.size + 2 * BOOK_ENTRIES:
+                raise ValueError(f"{path} has the wrong size.")
+            magic, version, entry_size, entries, crc = BOOK_HEADER.unpack_from(self.data)
+            if (magic, version, entry_size, entries) != (BOOK_MAGIC, BOOK_VERSION, 2, BOOK_ENTRIES):
+                raise ValueError(f"{path} is not a version {BOOK_VERSION} opening book.")
+            if zlib.crc32(memoryview(self.data)[BOOK_HEADER.size:]) != crc:
+                raise ValueError(f"{path} failed its checksum.")
+        except ValueError:
+            self.data.close()
+            raise
+        self.path = path
+
+    def entry(self, x, o, player):
+        """(move cell or None, value for X) for the position."""
+        offset = BOOK_HEADER.size + 2 * book_index(x, o, player)
+        cell, value = self.data[offset], self.data[offset + 1]
+        return (None if cell == NO_MOVE else cell), (value - 256 if value > 127 else value)
+
+    def best_move(self, x, o, player):
+        """
+        Best move (row, col) for `player`, or None if the game is over or the
+        position cannot arise with `player` to move, whichever side moved first.
+        """
+        cell = self.entry(x, o, player)[0]
+        return None if cell is None else CELLS[cell]
+
+
+_opening_book = None
+_opening_book_loaded = False
+
+
+def get_opening_book():
+    """
+    The shared opening book, loaded on first use. Returns None when the file
+    is missing or damaged, in which case callers fall back to searching.
+    """
+    global _opening_book, _opening_book_loaded
+    if not _opening_book_loaded:
+        _opening_book_loaded = True
+        try:
+            _opening_book = OpeningBook()
+        except (OSError, ValueError) as e:
+            _opening_book = None
+            print(f"[WARNING] Opening book unavailable, searching instead: {e}")
+    return _opening_book
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchEngine:
+    """
+    Alpha-beta search for N x N boards where k in a row wins.
+
+    Positions are bitboards with bit `size * row + col` per cell. The search
+    is a negamax alpha-beta with a transposition table, tries the previous
+    best move first and otherwise orders moves center-first, and deepens
+    iteratively until the board is solved or the time budget runs out. At the
+    depth cutoff, positions get a heuristic score: open lines weighted by
+    how many of the player's marks they already hold.
+
+    Wins are scored WIN_SCORE minus the number of plies to reach them, so
+    the engine prefers the quickest win and the slowest loss. A completed
+    search to full depth therefore plays perfectly, which is always the case
+    on 3x3 within any practical budget.
+
+    After each call, last_search holds the node count, completed depth,
+    score and elapsed time.
+    """
+    WIN_SCORE = 1000000
+    CHECK_EVERY = 1024  # Nodes between time-budget checks
+
+    def __init__(self, size=3, win_length=None, time_budget=1.0):
+        self.size = size
+        self.win_length = win_length or default_win_length(size)
+        if not 1 <= self.win_length <= size:
+            raise ValueError("Win length must be between 1 and the board size.")
+        self.time_budget = time_budget
+        self.cell_count = size * size
+        self.full_mask = (1 << self.cell_count) - 1
+
+        self.lines = [sum(1 << (size * r + c) for r, c in line)
+                      for line in winning_lines(size, self.win_length)]
+        self.lines_through = [[line for line in self.lines if line >> i & 1] for i in range(self.cell_count)]
+        self.line_weights = [0] + [10 ** count for count in range(1, self.win_length + 1)]
+
+        center = (size - 1) / 2
+        self.move_order = sorted(range(self.cell_count),
+                                 key=lambda i: (abs(i // size - center) + abs(i % size - center), i))
+
+        self.table = {}
+        self.nodes = 0
+        self.deadline = None
+        self.cancel = None
+        self.last_search = {}
+        # Standard 3x3 games are answered from the opening book when it is available
+        self.book = get_opening_book() if (size, self.win_length) == (3, 3) else None
+
+    def board_to_bits(self, board):
+        x = o = 0
+        for r in range(self.size):
+            for c in range(self.size):
+                if board[r][c] == 'X':
+                    x |= 1 << (self.size * r + c)
+                elif board[r][c] == 'O':
+                    o |= 1 << (self.size * r + c)
+        return x, o
+
+    def is_win_through(self, bits, cell):
+        for line in self.lines_through[cell]:
+            if bits & line == line:
+                return True
+        return False
+
+    def evaluate(self, me, opp):
+        """Heuristic value of the position for the side to move."""
+        score = 0
+        weights = self.line_weights
+        for line in self.lines:
+            mine = me & line
+            theirs = opp & line
+            if mine and not theirs:
+                score += weights[mine.bit_count()]
+            elif theirs and not mine:
+                score -= weights[theirs.bit_count()]
+        return score
+
+    def ordered_moves(self, me, opp, first=None):
+        occupied = me | opp
+        moves = [i for i in self.move_order if not occupied >> i & 1]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, me, opp, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % self.CHECK_EVERY == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchTimeout()
+
+        if me | opp == self.full_mask:
+            return 0, None
+        if depth == 0:
+            return self.evaluate(me, opp), None
+
+        key = (me, opp)
+        entry = self.table.get(key)
+        best_hint = None
+        if entry is not None:
+            entry_depth, flag, value, best_hint = entry
+            if entry_depth >= depth:
+                value = self.from_table(value, ply)
+                if flag == 0 or (flag > 0 and value >= beta) or (flag < 0 and value <= alpha):
+                    return value, best_hint
+
+        original_alpha = alpha
+        best_score = -self.WIN_SCORE - 1
+        best_move = None
+        for cell in self.ordered_moves(me, opp, best_hint):
+            moved = me | 1 << cell
+            if self.is_win_through(moved, cell):
+                score = self.WIN_SCORE - ply - 1
+            else:
+                score = -self.negamax(opp, moved, depth - 1, -beta, -alpha, ply + 1)[0]
+            if score > best_score:
+                best_score, best_move = score, cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        flag = 1 if best_score >= beta else (-1 if best_score <= original_alpha else 0)
+        self.table[key] = (depth, flag, self.to_table(best_score, ply), best_move)
+        return best_score, best_move
+
+    def to_table(self, score, ply):
+        # Store win/loss scores relative to this node so they stay valid at other plies
+        if score > self.WIN_SCORE - 1000:
+            return score + ply
+        if score < -self.WIN_SCORE + 1000:
+            return score - ply
+        return score
+
+    def from_table(self, score, ply):
+        if score > self.WIN_SCORE - 1000:
+            return score - ply
+        if score < -self.WIN_SCORE + 1000:
+            return score + ply
+        return score
+
+    def find_best_move(self, board, player='X', time_budget=None, cancel=None):
+        """
+        Best move (row, col) for `player` on `board`, or None if the game
+        is already over.
+
+        Setting the `cancel` event stops the search within CHECK_EVERY nodes;
+        the best move found so far is returned and last_search['cancelled']
+        is set.
+        """
+        x, o = self.board_to_bits(board)
+        me, opp = (x, o) if player == 'X' else (o, x)
+        empties = self.cell_count - (x | o).bit_count()
+        start = time.perf_counter()
+        self.nodes = 0
+        self.last_search = {'nodes': 0, 'depth': 0, 'score': None, 'elapsed': 0.0, 'completed': False,
+                            'book': False, 'cancelled': False}
+        if empties == 0 or any(x & line == line or o & line == line for line in self.lines):
+            return None
+        move = None if self.book is None else self.book.best_move(x, o, player)
+        if move is not None:
+            self.last_search.update(completed=True, book=True, elapsed=time.perf_counter() - start)
+            return move
+
+        budget = self.time_budget if time_budget is None else time_budget
+        self.deadline = None if budget is None else start + budget
+        self.cancel = cancel
+        # Scores are only valid for the position they were searched from
+        self.table.clear()
+        best_move = self.ordered_moves(me, opp)[0]
+        try:
+            for depth in range(1, empties + 1):
+                score, move = self.negamax(me, opp, depth, -self.WIN_SCORE - 1, self.WIN_SCORE + 1, 0)
+                best_move = move
+                self.last_search.update(depth=depth, score=score, completed=depth == empties)
+                if abs(score) > self.WIN_SCORE - 1000:
+                    self.last_search['completed'] = True
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self.deadline = self.cancel = None
+            self.last_search['cancelled'] = cancel is not None and cancel.is_set()
+            self.last_search['nodes'] = self.nodes
+            self.last_search['elapsed'] = time.perf_counter() - start
+        return divmod(best_move, self.size)
+
+
+class GameState:
+    """
+    A board together with its cached outcome.
+
+    play() only inspects the lines through the cell just played, so the
+    outcome is kept current in O(win_length) per move instead of rescanning
+    the board. Cells changed since the last take_dirty() are remembered, so
+    a view only has to redraw those.
+    """
+    ONGOING = 'ongoing'
+    DRAW = 'draw'
+
+    def __init__(self, size=3, win_length=None):
+        self.size = size
+        self.win_length = win_length or default_win_length(size)
+        self.board = [[' '] * size for _ in range(size)]
+        self.moves = []
+        self.status = self.ONGOING
+        self.dirty = set()
+
+    @property
+    def is_over(self):
+        return self.status != self.ONGOING
+
+    @property
+    def winner(self):
+        """'X' or 'O' once someone has won, otherwise None."""
+        return self.status if self.status in ('X', 'O') else None
+
+    @property
+    def last_move(self):
+        return self.moves[-1] if self.moves else None
+
+    def play(self, row, col, player):
+        if self.is_over:
+            raise ValueError("The game is already over.")
+        if self.board[row][col] != ' ':
+            raise ValueError(f"Cell ({row}, {col}) is already taken.")
+        self.board[row][col] = player
+        self.moves.append((row, col))
+        self.dirty.add((row, col))
+        if self.wins_through(row, col, player):
+            self.status = player
+        elif len(self.moves) == self.size * self.size:
+            self.status = self.DRAW
+
+    def wins_through(self, row, col, player):
+        """Whether `player` has win_length in a row through (row, col)."""
+        board, n = self.board, self.size
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for step in (1, -1):
+                r, c = row + step * dr, col + step * dc
+                while 0 <= r < n and 0 <= c < n and board[r][c] == player:
+                    count += 1
+                    r, c = r + step * dr, c + step * dc
+            if count >= self.win_length:
+                return True
+        return False
+
+    def reset(self):
+        for r, c in self.moves:
+            self.board[r][c] = ' '
+        self.dirty.update(self.moves)
+        self.moves = []
+        self.status = self.ONGOING
+
+    def take_dirty(self):
+        """The cells changed since the last call, clearing the record."""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+class AIWorker:
+    """
+    Runs SearchEngine searches on a background thread.
+
+    Requests are handled one at a time, in order. Every result is put on
+    `results` as (request id, player, move, search stats); the GUI polls that
+    queue from the Tk event loop, so the window never waits on a search.
+    cancel() stops the running search and drops the queued ones.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = set()  # Cancel events of requests not yet finished
+        self.thread = threading.Thread(target=self.run, name="tictac-ai", daemon=True)
+        self.thread.start()
+
+    def submit(self, request_id, board, player):
+        cancel = threading.Event()
+        with self._lock:
+            self._pending.add(cancel)
+        self.requests.put((request_id, [row[:] for row in board], player, cancel))
+
+    def cancel(self):
+        with self._lock:
+            for event in self._pending:
+                event.set()
+            self._pending.clear()
+
+    def stop(self):
+        self.cancel()
+        self.requests.put(None)
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            request_id, board, player, cancel = request
+            if cancel.is_set():
+                continue
+            move = self.engine.find_best_move(board, player, cancel=cancel)
+            with self._lock:
+                self._pending.discard(cancel)
+            if not cancel.is_set():
+                self.results.put((request_id, player, move, dict(self.engine.last_search)))
+
+
 class TicTacToeGUI:
-    def __init__(self, master):
+    POLL_MS = 20  # How often the GUI checks for finished AI searches
+    def __init__(self, master, size=3, win_length=None, time_budget=1.0):
         self.master = master
         master.title("Tic-Tac-Toe")
 
-        self.board = [[' '] * 3 for _ in range(3)]
+        self.size = size
+        self.engine = SearchEngine(size, win_length, time_budget)
+        self.win_length = self.engine.win_length
+        self.state = GameState(size, self.win_length)
         self.buttons = []
         self.player_turn = 'O'
         self.game_mode = 1
+        # Bumped on every reset; AI results and scheduled moves from an older game are ignored
+        self.game_id = 0
+        self.ai_thinking = False
+        self.ai_worker = AIWorker(self.engine)
 
         self.create_widgets()
         self.master.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.master.after(self.POLL_MS, self.poll_ai)
 
     def create_widgets(self):
-        for r in range(3):
+        for r in range(self.size):
             row_buttons = []
-            for c in range(3):
+            for c in range(self.size):
                 button = tk.Button(self.master, text=' ', font=('Arial', 24), width=5, height=2,
                                    command=lambda r=r, c=c: self.handle_click(r, c))
                 button.grid(row=r, column=c)
@@ -84,16 +712,16 @@ class TicTacToeGUI:
             self.buttons.append(row_buttons)
 
         self.mode_frame = tk.Frame(self.master)
-        self.mode_frame.grid(row=3, columnspan=3)
+        self.mode_frame.grid(row=self.size, columnspan=self.size)
 
         tk.Button(self.mode_frame, text="Player vs AI", command=lambda: self.set_mode(1)).pack(side=tk.LEFT)
         tk.Button(self.mode_frame, text="AI vs AI", command=lambda: self.set_mode(2)).pack(side=tk.RIGHT)
 
         self.reset_button = tk.Button(self.master, text="Reset", command=self.reset_game)
-        self.reset_button.grid(row=4, columnspan=3)
+        self.reset_button.grid(row=self.size + 1, columnspan=self.size)
 
         self.status_label = tk.Label(self.master, text="Player (O) turn", font=('Arial', 12))
-        self.status_label.grid(row=5, columnspan=3)
+        self.status_label.grid(row=self.size + 2, columnspan=self.size)
 
     def set_mode(self, mode):
         self.game_mode = mode
@@ -104,42 +732,58 @@ class TicTacToeGUI:
         self.reset_game()
 
     def handle_click(self, row, col):
-        if self.board[row][col] == ' ' and self.game_mode == 1:
-            self.board[row][col] = 'O'
-            self.buttons[row][col].config(text='O')
+        if (self.state.board[row][col] == ' ' and self.game_mode == 1 and self.player_turn == 'O'
+                and not self.ai_thinking and not self.state.is_over):
+            self.state.play(row, col, 'O')
             self.player_turn = 'X'
             self.status_label.config(text="AI (X) turn")
             self.update_board()
-            if not check_win(self.board, 'O') and not is_board_full(self.board):
-                self.master.after(500, self.ai_move)
+            if not self.state.is_over:
+                self.master.after(500, self.ai_move, self.game_id)
 
-    def ai_move(self):
-        if check_win(self.board, 'O') or check_win(self.board, 'X') or is_board_full(self.board):
+    def ai_move(self, game_id):
+        if game_id != self.game_id or self.ai_thinking or self.state.is_over:
             return
-
-        move = find_best_move(self.board)
+        self.ai_thinking = True
+        self.ai_worker.submit(self.game_id, self.state.board, self.player_turn)
+
+    def poll_ai(self):
+        try:
+            while True:
+                game_id, player, move, _ = self.ai_worker.results.get_nowait()
+                if game_id == self.game_id and player == self.player_turn:
+                    self.ai_thinking = False
+                    self.apply_ai_move(move)
+        except queue.Empty:
+            pass
+        self.master.after(self.POLL_MS, self.poll_ai)
+
+    def apply_ai_move(self, move):
+        game_id = self.game_id
         if move:
             row, col = move
-            self.board[row][col] = self.player_turn
-            self.buttons[row][col].config(text=self.player_turn)
+            self.state.play(row, col, self.player_turn)
             self.player_turn = 'O' if self.player_turn == 'X' else 'X'
             status = f"{'AI (X)' if self.player_turn == 'X' else 'AI (O)'} turn"
             self.status_label.config(text=status)
             self.update_board()
 
-        if self.game_mode == 2 and not check_win(self.board, 'X') and not check_win(self.board, 'O') and not is_board_full(self.board):
-            self.master.after(500, self.ai_move)
+        # update_board() starts a new game when this move ended one, and that schedules its own AI move
+        if self.game_mode == 2 and game_id == self.game_id and not self.state.is_over:
+            self.master.after(500, self.ai_move, self.game_id)
+
+    def redraw(self):
+        for r, c in self.state.take_dirty():
+            self.buttons[r][c].config(text=self.state.board[r][c])
 
     def update_board(self):
-        for r in range(3):
-            for c in range(3):
-                self.buttons[r][c].config(text=self.board[r][c])
+        self.redraw()
 
-        if check_win(self.board, 'O'):
+        if self.state.status == 'O':
             self.show_game_over("Player (O) wins!")
-        elif check_win(self.board, 'X'):
+        elif self.state.status == 'X':
             self.show_game_over("AI (X) wins!")
-        elif is_board_full(self.board):
+        elif self.state.status == GameState.DRAW:
             self.show_game_over("It's a tie!")
 
     def show_game_over(self, message):
@@ -147,21 +791,36 @@ class TicTacToeGUI:
         self.reset_game()
 
     def reset_game(self):
-        self.board = [[' '] * 3 for _ in range(3)]
-        for r in range(3):
-            for c in range(3):
-                self.buttons[r][c].config(text=' ')
+        self.ai_worker.cancel()
+        self.ai_thinking = False
+        self.game_id += 1
+        self.state.reset()
+        self.redraw()
         self.player_turn = 'O'
         self.status_label.config(text="Player (O) turn" if self.game_mode == 1 else "AI vs AI mode")
         if self.game_mode == 2:
-            self.master.after(500, self.ai_move)
+            self.master.after(500, self.ai_move, self.game_id)
 
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Are you sure you want to quit?"):
+            self.ai_worker.stop()
             self.master.destroy()
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tic-tac-toe against the computer.")
+    parser.add_argument('--size', type=int, default=3, help="board size N (default: 3)")
+    parser.add_argument('--win-length', type=int, help="marks in a row needed to win (default: min(N, 4))")
+    parser.add_argument('--time-budget', type=float, default=1.0, help="seconds per AI move")
+    parser.add_argument('--build-book', nargs='?', const=BOOK_PATH, metavar='PATH',
+                        help="solve 3x3 and write the opening book (default: next to this script), then exit")
+    args = parser.parse_args()
+    if args.build_book:
+        print(f"[INFO] Opening book written to {write_opening_book(args.build_book)}")
+        raise SystemExit(0)
+
     root = tk.Tk()
-    gui = TicTacToeGUI(root)
+    gui = TicTacToeGUI(root, args.size, args.win_length, args.time_budget)
     root.mainloop()